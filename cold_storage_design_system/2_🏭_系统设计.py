@@ -2,15 +2,20 @@ import base64
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
 import json
+import copy
 from pathlib import Path
 from io import BytesIO
 import sys
 import os
+import math
+import functools
 from scipy.optimize import minimize
+from jinja2 import Template
+
+# 选型结果LRU缓存容量：单次方案生成约百余个不同负荷，留足余量并限制常驻内存
+SELECTION_CACHE_SIZE = 1024
 
 
 # 添加路径以便导入自定义模块
@@ -23,6 +28,7 @@ try:
     from compressor_database_enhanced import BitzerCompressorCalculator, CDS3001BCalculator
     from heat_load_calculator import HeatLoadCalculator
     from data_sharing import DataSharing
+    from _numba_compat import njit
 except ImportError as e:
     st.error(f"❌ 模块导入错误: {e}")
     st.info("请确保所有依赖文件都在同一目录下")
@@ -242,7 +248,7 @@ class IntelligentColdFanSelector:
             single_capacity = fan_info['capacity']
 
             # 计算最小需求台数N
-            min_units_required = int(np.ceil(required_capacity_kw / single_capacity))
+            min_units_required = math.ceil(required_capacity_kw / single_capacity)
 
 
             # 台数范围控制
@@ -334,7 +340,7 @@ class IntelligentColdFanSelector:
             single_capacity = fan_info['capacity']
 
             # 计算最小需求台数
-            min_units = int(np.ceil(required_capacity_kw / single_capacity))
+            min_units = math.ceil(required_capacity_kw / single_capacity)
 
             # 尝试不同台数（从小开始）
             for units in range(min_units, min_units + 3):  # 最多尝试+2台
@@ -488,6 +494,8 @@ class PlateHeatExchangerSelector:
 
     def __init__(self, json_file_path="板换选型表.json"):
         """初始化板换选型数据库"""
+        self._selection_cache = functools.lru_cache(maxsize=SELECTION_CACHE_SIZE)(self._select_plate_exchanger)
+
         try:
             with open(json_file_path, 'r', encoding='utf-8') as f:
                 self.data = json.load(f)
@@ -551,6 +559,10 @@ class PlateHeatExchangerSelector:
             return []
 
     def select_plate_exchanger(self, required_capacity_kw):
+        """根据需求制冷量选择板式换热器（相同需求直接返回缓存结果）"""
+        return self._selection_cache(required_capacity_kw)
+
+    def _select_plate_exchanger(self, required_capacity_kw):
         """根据需求制冷量选择板式换热器"""
         selected_model = None
         min_diff = float('inf')
@@ -601,8 +613,13 @@ class EvaporativeCondenserSelector:
             self.data = json.load(f)
 
         self.condensers = self.data.get("items", [])
+        self._selection_cache = functools.lru_cache(maxsize=SELECTION_CACHE_SIZE)(self._select_condenser)
 
     def select_condenser(self, required_heat_rejection_kw):
+        """根据需求排热量选择蒸发式冷凝器（相同需求直接返回缓存结果）"""
+        return self._selection_cache(required_heat_rejection_kw)
+
+    def _select_condenser(self, required_heat_rejection_kw):
         """根据需求排热量选择蒸发式冷凝器"""
         selected_condenser = None
         min_diff = float('inf')
@@ -618,7 +635,7 @@ class EvaporativeCondenserSelector:
 
         if selected_condenser:
             capacity = selected_condenser.get("名义工况排热量KW", 0)
-            required_count = max(1, int(np.ceil(required_heat_rejection_kw / capacity)))
+            required_count = max(1, math.ceil(required_heat_rejection_kw / capacity))
             unit_price = selected_condenser.get("单价(元)", 0)
             total_price = unit_price * required_count
 
@@ -636,6 +653,14 @@ class EvaporativeCondenserSelector:
         return {"selected": False, "message": "未找到合适的冷凝器型号"}
 
 
+# 复叠系统温度组合网格（选型时的固定候选值）
+# 蒸发温度比冷间温度低5-15°C，冷凝温度比环境温度高8-15°C，中间温度-15°C到0°C
+EVAP_DELTAS = (5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15)
+COND_DELTAS = (8, 9, 10, 11, 12, 13, 14, 15)
+CASCADE_TEMPS = np.linspace(-15, 0, 16)
+CASCADE_TEMPS.flags.writeable = False
+
+
 class IntelligentCompressorSelector:
     """智能压缩机选型器 - 严格按复叠系统逻辑"""
 
@@ -667,12 +692,21 @@ class IntelligentCompressorSelector:
             # 高温级需要承担的额外制冷负荷（来自中温/高温库）
             self.high_temp_load_kw = total_high_temp_load_kw
 
+            # 高温级性能缓存
+            self._high_stage_perf_cache = {}
+            self._best_high_power_cache = functools.lru_cache(maxsize=SELECTION_CACHE_SIZE)(
+                self._calc_best_high_stage_power)
+
             # 初始化计算器
             self.bitzer_calc = BitzerCompressorCalculator(self.bitzer_data)
             co2_compressor_data = self.duling_data[0]  # 获取第一个都凌压缩机数据
             self.co2_calc = CDS3001BCalculator(co2_compressor_data)
             self.duling_cds3001b_price = co2_compressor_data.get("价格", 19000)
 
+            # 辅助设备选型器只初始化一次，避免每次性能计算重复读取选型表
+            self.plate_selector = PlateHeatExchangerSelector()
+            self.condenser_selector = EvaporativeCondenserSelector()
+
             print(f"✅ 智能压缩机选型器初始化完成")
             print(f"   - 加载{len(self.bitzer_data)}个比泽尔型号")
             print(f"   - 加载{len(self.duling_data)}个都凌型号")
@@ -708,14 +742,12 @@ class IntelligentCompressorSelector:
 
         # 1. 低温级蒸发温度（由库温决定）
         # 蒸发温度比冷间温度低5-15°C
-        evap_deltas = [5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
-        evap_temp_options = [room_temp - delta for delta in evap_deltas]
+        evap_temp_options = [room_temp - delta for delta in EVAP_DELTAS]
         print(f"   低温级蒸发温度选项: {evap_temp_options}")
 
         # 2. 高温级冷凝温度（由环境温度决定）
         # 冷凝温度比环境温度高8-15°C
-        cond_deltas = [8, 9, 10, 11, 12, 13, 14, 15]
-        cond_temp_options = [ambient_temp + delta for delta in cond_deltas]
+        cond_temp_options = [ambient_temp + delta for delta in COND_DELTAS]
         # 限制在合理范围：20-45°C
         cond_temp_options = [t for t in cond_temp_options if 20 <= t <= 45]
         print(f"   高温级冷凝温度选项: {cond_temp_options}")
@@ -729,7 +761,7 @@ class IntelligentCompressorSelector:
 
         # 3. 中间温度范围（连接低温级和高温级）
         # 合理的中间温度范围：-15°C 到 0°C
-        cascade_temp_options = np.linspace(-15, 0, 16)  # -15, -14, ..., 0
+        cascade_temp_options = CASCADE_TEMPS  # -15, -14, ..., 0
 
         # ================ 第二步：优化中间温度 ================
 
@@ -901,6 +933,48 @@ class IntelligentCompressorSelector:
 
         return True
 
+    def _get_high_stage_performance(self, cascade_temp, cond_temp):
+        """
+        获取指定工况下所有比泽尔型号的性能（按工况缓存）
+
+        Returns:
+            tuple: (有效型号列表[(comp_data, high_perf)], 单台制冷量数组, 单台功率数组)
+        """
+        key = (cascade_temp, cond_temp)
+        if key not in self._high_stage_perf_cache:
+            valid_models = []
+            for comp_data in self.bitzer_data:
+                high_perf = self.bitzer_calc.calculate_performance(
+                    model=comp_data.get("型号", ""),
+                    evap_temp=cascade_temp,  # 高温级蒸发温度 = 中间温度
+                    cond_temp=cond_temp  # 高温级冷凝温度 = 最终冷凝温度
+                )
+                if high_perf.get('calculation_valid', False):
+                    valid_models.append((comp_data, high_perf))
+
+            capacities = np.array([perf['cooling_capacity_kw'] for _, perf in valid_models], dtype=float)
+            powers = np.array([perf['power_consumption_kw'] for _, perf in valid_models], dtype=float)
+            self._high_stage_perf_cache[key] = (valid_models, capacities, powers)
+
+        return self._high_stage_perf_cache[key]
+
+    def _best_high_stage_power(self, cascade_temp, cond_temp, high_stage_load):
+        """计算满足高温级负荷的最小总功率（无可行配置时返回inf）"""
+        return self._best_high_power_cache(cascade_temp, cond_temp, high_stage_load)
+
+    def _calc_best_high_stage_power(self, cascade_temp, cond_temp, high_stage_load):
+        """按型号向量化求满足高温级负荷的最小总功率"""
+        _, capacities, powers = self._get_high_stage_performance(cascade_temp, cond_temp)
+        usable = capacities > 0
+
+        best_high_power = float('inf')
+        if usable.any():
+            # 各型号所需台数及总功率（向量化计算）
+            high_units = np.maximum(1, np.ceil(high_stage_load / capacities[usable]))
+            best_high_power = float((powers[usable] * high_units).min())
+
+        return best_high_power
+
     def _calculate_cascade_system_cop(self, evap_temp, cascade_temp, cond_temp, load_kw):
         """计算复叠系统COP"""
 
@@ -921,7 +995,7 @@ class IntelligentCompressorSelector:
                 return 0
 
             # 2. 计算低温级配置（N+1冗余）
-            min_units = max(1, int(np.ceil(load_kw / low_capacity)))
+            min_units = max(1, math.ceil(load_kw / low_capacity))
             selected_units = min_units + 1
 
             total_low_capacity = low_capacity * selected_units
@@ -932,33 +1006,7 @@ class IntelligentCompressorSelector:
             high_stage_load = low_stage_heat_rejection + self.high_temp_load_kw
 
             # 4. 找到最小功率的高温级配置
-            best_high_power = float('inf')
-
-            for comp_data in self.bitzer_data:
-                model = comp_data.get("型号", "")
-                if not model:
-                    continue
-
-                high_perf = self.bitzer_calc.calculate_performance(
-                    model=model,
-                    evap_temp=cascade_temp,  # 高温级蒸发温度 = 中间温度
-                    cond_temp=cond_temp  # 高温级冷凝温度 = 最终冷凝温度
-                )
-
-                if not high_perf.get('calculation_valid', False):
-                    continue
-
-                high_capacity = high_perf['cooling_capacity_kw']
-                if high_capacity <= 0:
-                    continue
-
-                # 计算所需台数
-                high_units = max(1, int(np.ceil(high_stage_load / high_capacity)))
-
-                if high_capacity * high_units >= high_stage_load:
-                    total_high_power = high_perf['power_consumption_kw'] * high_units
-                    if total_high_power < best_high_power:
-                        best_high_power = total_high_power
+            best_high_power = self._best_high_stage_power(cascade_temp, cond_temp, high_stage_load)
 
             if best_high_power == float('inf'):
                 return 0
@@ -999,7 +1047,7 @@ class IntelligentCompressorSelector:
         power_kw = performance_result['power_consumption_kw']
 
         # 计算配置
-        min_units = max(1, int(np.ceil(required_load_kw / capacity_kw)))
+        min_units = max(1, math.ceil(required_load_kw / capacity_kw))
         selected_units = min_units + 1  # N+1冗余
 
         total_capacity = capacity_kw * selected_units
@@ -1045,56 +1093,48 @@ class IntelligentCompressorSelector:
             return {'selected': False, 'error': error_msg}
 
         best_selection = None
-        best_margin = float('inf')
 
-        for comp_data in self.bitzer_data:
+        # 利用按工况缓存的性能表，向量化计算各型号台数与余量
+        valid_models, capacities, _ = self._get_high_stage_performance(cascade_temp, cond_temp)
+        usable = capacities > 0
+        margins = np.full(len(valid_models), np.inf)
+        if usable.any():
+            units = np.maximum(1, np.ceil(high_stage_load_kw / capacities[usable]))
+            margins[usable] = capacities[usable] * units - high_stage_load_kw
+        margins[margins < 0] = np.inf  # 不满足需求
+
+        # 选择最接近需求的配置（余量相同时取靠前的型号）
+        if len(margins) and np.isfinite(margins).any():
+            comp_data, high_perf = valid_models[int(np.argmin(margins))]
             model = comp_data.get("型号", "")
 
-            # 计算性能
-            high_perf = self.bitzer_calc.calculate_performance(
-                model=model,
-                evap_temp=cascade_temp,  # 高温级蒸发温度 = 中间温度
-                cond_temp=cond_temp  # 高温级冷凝温度
-            )
-
-            if not high_perf.get('calculation_valid', False):
-                continue
-
             capacity_kw = high_perf['cooling_capacity_kw']
             power_kw = high_perf['power_consumption_kw']
 
             # 计算所需台数
-            min_units = max(1, int(np.ceil(high_stage_load_kw / capacity_kw)))
-            selected_units = min_units
+            selected_units = max(1, math.ceil(high_stage_load_kw / capacity_kw))
 
             total_capacity = capacity_kw * selected_units
             margin = total_capacity - high_stage_load_kw
-
-            if margin < 0:  # 不满足需求
-                continue
-
             margin_percent = (margin / high_stage_load_kw) * 100
 
-            # 选择最接近需求的配置
-            if margin < best_margin:
-                best_margin = margin
-                best_selection = {
-                    'selected': True,
-                    'brand': '比泽尔',
-                    'model': model,
-                    'refrigerant': comp_data.get("制冷剂", "R507A"),
-                    'evap_temp': cascade_temp,
-                    'cond_temp': cond_temp,
-                    'single_capacity_kw': round(capacity_kw, 2),
-                    'single_power_kw': round(power_kw, 2),
-                    'single_cop': round(high_perf['cop'], 2),
-                    'selected_units': selected_units,
-                    'total_capacity_kw': round(total_capacity, 2),
-                    'total_power_kw': round(power_kw * selected_units, 2),
-                    'capacity_margin_percent': round(margin_percent, 1),
-                    'price': comp_data.get("价格", 0),
-                    'total_price': comp_data.get("价格", 0) * selected_units
-                }
+            best_selection = {
+                'selected': True,
+                'brand': '比泽尔',
+                'model': model,
+                'refrigerant': comp_data.get("制冷剂", "R507A"),
+                'evap_temp': cascade_temp,
+                'cond_temp': cond_temp,
+                'single_capacity_kw': round(capacity_kw, 2),
+                'single_power_kw': round(power_kw, 2),
+                'single_cop': round(high_perf['cop'], 2),
+                'selected_units': selected_units,
+                'total_capacity_kw': round(total_capacity, 2),
+                'total_power_kw': round(power_kw * selected_units, 2),
+                'capacity_margin_percent': round(margin_percent, 1),
+                'price': comp_data.get("价格", 0),
+                'total_price': comp_data.get("价格", 0) * selected_units
+            }
 
         if best_selection:
             print(f"   ✅ 高温级选型成功:")
@@ -1135,19 +1175,15 @@ class IntelligentCompressorSelector:
         # 总压缩机成本
         total_compressor_cost = low_stage['total_price'] + high_stage['total_price']
 
-        # 初始化板换和蒸发冷选择器
-        plate_selector = PlateHeatExchangerSelector()
-        condenser_selector = EvaporativeCondenserSelector()
-
         # 1. 板换选型
         # 板换需要承担高温级的排热量
         plate_heat_load = high_stage['total_capacity_kw'] + high_stage['total_power_kw']
-        plate_selection = plate_selector.select_plate_exchanger(plate_heat_load)
+        plate_selection = self.plate_selector.select_plate_exchanger(plate_heat_load)
 
         # 2. 蒸发冷选型
         # 蒸发冷需要承担高温级的排热量
         condenser_heat_load = high_stage['total_capacity_kw'] + high_stage['total_power_kw']
-        condenser_selection = condenser_selector.select_condenser(condenser_heat_load)
+        condenser_selection = self.condenser_selector.select_condenser(condenser_heat_load)
 
         return {
             'total_cooling_capacity_kw': round(total_cooling_capacity, 2),
@@ -1173,13 +1209,46 @@ class IntelligentCompressorSelector:
             }
         }
 
+
+@njit(cache=True)
+def _comprehensive_scores(costs, cops, cascade_temps, low_margins, high_margins):
+    """综合评分内核（分数越低越好）：输入为各配置的属性数组，返回评分数组"""
+    # 获取基准值（用于归一化）
+    max_cost = costs.max()
+    min_cost = costs.min()
+    max_cop = cops.max()
+    min_cop = cops.min()
+
+    # 归一化处理
+    if max_cost > min_cost:
+        norm_cost = (costs - min_cost) / (max_cost - min_cost)
+    else:
+        norm_cost = np.zeros_like(costs)
+    if max_cop > min_cop:
+        norm_cop = 1 - (cops - min_cop) / (max_cop - min_cop)
+    else:
+        norm_cop = np.zeros_like(cops)
+
+    # 中间温度评分（越接近-5°C越好）
+    temp_score = np.abs(cascade_temps + 5) / 15
+
+    # 余量评分（越接近15%越好）
+    margin_score = (np.abs(low_margins - 15) + np.abs(high_margins - 15)) / 30
+
+    # 权重分配：成本0.4，COP 0.3，中间温度0.2，余量0.1
+    return (norm_cost * 0.4 +
+            norm_cop * 0.3 +
+            temp_score * 0.2 +
+            margin_score * 0.1)
+
+
 class BusinessIntelligenceSelector:
     """商务智能选型引擎 - 生成三种方案（优化版）"""
 
     def __init__(self):
         self.compressor_selector = IntelligentCompressorSelector()
-        self.plate_exchanger_selector = PlateHeatExchangerSelector()
-        self.condenser_selector = EvaporativeCondenserSelector()
+        self.plate_exchanger_selector = self.compressor_selector.plate_selector
+        self.condenser_selector = self.compressor_selector.condenser_selector
 
     def generate_proposals(self, low_temp_load_kw, room_temp, ambient_temp):
         """生成三种专业提案（优化版逻辑）"""
@@ -1214,20 +1283,14 @@ class BusinessIntelligenceSelector:
 
     def _get_all_feasible_configs(self, low_temp_load_kw, room_temp, ambient_temp):
         """获取所有可行的配置组合"""
-        all_configs = []
-
-        # 温度组合遍历
-        evap_deltas = [5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
-        cond_deltas = [8, 9, 10, 11, 12, 13, 14, 15]
-        cascade_temps = np.linspace(-15, 0, 16)
-
-        # 遍历所有可能的温度组合
-        for evap_temp in [room_temp - delta for delta in evap_deltas]:
-            for cond_temp in [ambient_temp + delta for delta in cond_deltas]:
+        # 收集所有满足约束的温度组合
+        triples = []
+        for evap_temp in [room_temp - delta for delta in EVAP_DELTAS]:
+            for cond_temp in [ambient_temp + delta for delta in COND_DELTAS]:
                 if cond_temp < 20 or cond_temp > 45:
                     continue
 
-                for cascade_temp in cascade_temps:
+                for cascade_temp in CASCADE_TEMPS:
                     # 检查温度组合是否合理
                     if not (evap_temp + 10 <= cascade_temp <= cond_temp - 15):
                         continue
@@ -1240,19 +1303,29 @@ class BusinessIntelligenceSelector:
                     if not self.compressor_selector._check_bitzer_constraints(cascade_temp, cond_temp):
                         continue
 
-                    # 计算配置
-                    config = self._evaluate_config(
-                        evap_temp, cascade_temp, cond_temp, low_temp_load_kw
-                    )
+                    triples.append((evap_temp, cascade_temp, cond_temp))
 
-                    if config:
-                        all_configs.append(config)
+        # 依次评估各温度组合
+        all_configs = self._evaluate_triples_serial(triples, low_temp_load_kw)
 
         # 计算每个配置的综合评分
-        for config in all_configs:
-            config['comprehensive_score'] = self._calculate_comprehensive_score(config, all_configs)
+        self._calculate_comprehensive_scores(all_configs)
+
+        # 按综合评分排序（后续均衡方案直接按此顺序选取）
+        all_configs.sort(key=lambda x: x['comprehensive_score'])
+
+        return all_configs
+
+    def _evaluate_triples_serial(self, triples, load_kw):
+        """单进程依次评估温度组合，返回可行配置列表"""
+        all_configs = []
+
+        for evap_temp, cascade_temp, cond_temp in triples:
+            # 计算配置
+            config = self._evaluate_config(evap_temp, cascade_temp, cond_temp, load_kw)
 
-        all_configs.sort(key=lambda x: self._calculate_comprehensive_score(x, all_configs))
+            if config:
+                all_configs.append(config)
 
         return all_configs
 
@@ -1312,39 +1385,21 @@ class BusinessIntelligenceSelector:
             print(f"配置评估失败: {e}")
             return None
 
-    def _calculate_comprehensive_score(self, config, all_configs):
-        """计算配置的综合评分（分数越低越好）"""
-        # 权重分配
-        cost_weight = 0.4
-        cop_weight = 0.3
-        temp_weight = 0.2
-        margin_weight = 0.1
-
+    def _calculate_comprehensive_scores(self, all_configs):
+        """批量计算所有配置的综合评分（分数越低越好），结果写入各配置的comprehensive_score"""
         if not all_configs:
-            return 0
-
-        # 获取基准值（用于归一化）
-        max_cost = max(c['total_cost'] for c in all_configs)
-        min_cost = min(c['total_cost'] for c in all_configs)
-        max_cop = max(c['system_cop'] for c in all_configs)
-        min_cop = min(c['system_cop'] for c in all_configs)
-
-        # 归一化处理
-        norm_cost = (config['total_cost'] - min_cost) / (max_cost - min_cost) if max_cost > min_cost else 0
-        norm_cop = 1 - (config['system_cop'] - min_cop) / (max_cop - min_cop) if max_cop > min_cop else 0
-
-        # 中间温度评分（越接近-5°C越好）
-        temp_score = abs(config['cascade_temp'] + 5) / 15
+            return
 
-        # 余量评分（越接近15%越好）
-        low_margin = config['low_stage']['capacity_margin_percent']
-        high_margin = config['high_stage']['capacity_margin_percent']
-        margin_score = (abs(low_margin - 15) + abs(high_margin - 15)) / 30
+        scores = _comprehensive_scores(
+            np.array([c['total_cost'] for c in all_configs], dtype=np.float64),
+            np.array([c['system_cop'] for c in all_configs], dtype=np.float64),
+            np.array([c['cascade_temp'] for c in all_configs], dtype=np.float64),
+            np.array([c['low_stage']['capacity_margin_percent'] for c in all_configs], dtype=np.float64),
+            np.array([c['high_stage']['capacity_margin_percent'] for c in all_configs], dtype=np.float64)
+        )
 
-        return (norm_cost * cost_weight +
-                norm_cop * cop_weight +
-                temp_score * temp_weight +
-                margin_score * margin_weight)
+        for config, score in zip(all_configs, scores.tolist()):
+            config['comprehensive_score'] = score
 
     def _calculate_comprehensive_score_temp(self, evap_temp, cascade_temp, cond_temp, load_kw):
         """基于温度参数计算综合评分"""
@@ -1419,17 +1474,16 @@ class BusinessIntelligenceSelector:
         )
 
     def _generate_balanced_proposal(self, all_configs, existing_proposals):
-        """均衡推荐方案：介于能效和经济方案之间"""
+        """均衡推荐方案：介于能效和经济方案之间（all_configs已按综合评分升序排列）"""
         if not all_configs or len(existing_proposals) < 2:
             return []  # 返回空列表而不是单个元素
 
         balanced_proposals = []
-        excluded_config_ids = []
 
         # 排除已经选为能效方案和经济方案的配置
-        for proposal in existing_proposals:
-            if 'config_id' in proposal:
-                excluded_config_ids.append(proposal['config_id'])
+        excluded_config_ids = {
+            proposal['config_id'] for proposal in existing_proposals if 'config_id' in proposal
+        }
 
         # 获取能效方案和经济方案的COP和成本
         if existing_proposals and 'system_performance' in existing_proposals[0]:
@@ -1454,7 +1508,7 @@ class BusinessIntelligenceSelector:
             target_cop_range = (0, float('inf'))
             target_cost_range = (0, float('inf'))
 
-        # 找出最接近中间值的配置（综合评分）
+        # 找出最接近中间值的配置（按综合评分顺序）
         balanced_candidates = []
         for config in all_configs:
             if config.get('config_id') in excluded_config_ids:
@@ -1466,15 +1520,14 @@ class BusinessIntelligenceSelector:
             if (target_cop_range[0] <= config_cop <= target_cop_range[1] and
                     target_cost_range[0] <= config_cost <= target_cost_range[1]):
                 balanced_candidates.append(config)
+                if len(balanced_candidates) >= 4:
+                    break
 
         # 如果没有中间范围的配置，选择综合评分最好的几个
         if not balanced_candidates:
-            # 按综合评分排序
-            all_configs_sorted = sorted(all_configs, key=lambda x: x.get('comprehensive_score', 0))
-
-            # 跳过已选方案，选择接下来的几个
+            # 跳过已选方案，选择综合评分最好的几个
             count = 0
-            for config in all_configs_sorted:
+            for config in all_configs:
                 if config.get('config_id') in excluded_config_ids:
                     continue
 
@@ -1490,9 +1543,6 @@ class BusinessIntelligenceSelector:
                 balanced_proposals.append(balanced_proposal)
                 count += 1
         else:
-            # 按综合评分排序
-            balanced_candidates.sort(key=lambda x: x.get('comprehensive_score', 0))
-
             # 选择最多4个配置
             for i, config in enumerate(balanced_candidates[:4]):
                 balanced_proposal = self._format_proposal(
@@ -1584,95 +1634,91 @@ def create_header_with_icon(title, icon_path="G:\cold_storage_design_system\icon
 
     return f'<h1 class="main-header">{icon_html}{title}</h1>'
 
-def generate_detailed_proposal_report(proposal, project_info, low_temp_rooms):
-    """生成详细提案报告"""
-
-    report = f"""
+# 详细报告模板：导入时编译一次，后续渲染直接复用
+_REPORT_TMPL = Template("""
 复叠制冷系统设计方案报告
 ============================
 
-生成时间: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+生成时间: {{ now.strftime("%Y-%m-%d %H:%M:%S") }}
 
 一、项目信息
 -----------
-项目名称: {project_info['project_name']}
-客户名称: {project_info['customer_name']}
-项目地区: {project_info['project_location']}
-夏季环境温度: {project_info['summer_temp']}°C
-冬季环境温度: {project_info['winter_temp']}°C
+项目名称: {{ project_info.project_name }}
+客户名称: {{ project_info.customer_name }}
+项目地区: {{ project_info.project_location }}
+夏季环境温度: {{ project_info.summer_temp }}°C
+冬季环境温度: {{ project_info.winter_temp }}°C
 
 二、低温冷间概况
 ---------------
-低温冷间数量: {len(low_temp_rooms)} 个
-低温系统总负荷: {sum(r.get('equipment_load_kw', 0) for r in low_temp_rooms):.1f} kW
+低温冷间数量: {{ low_temp_rooms|length }} 个
+低温系统总负荷: {{ '{:.1f}'.format(total_low_load) }} kW
 
 低温冷间详情:
-"""
-
-    for room in low_temp_rooms:
-        report += f"- {room['room_name']}: {room['temperature']}°C, 负荷: {room['equipment_load_kw']:.1f} kW\n"
+{% for room in low_temp_rooms %}
+- {{ room.room_name }}: {{ room.temperature }}°C, 负荷: {{ '{:.1f}'.format(room.equipment_load_kw) }} kW
+{% endfor %}
 
-    report += f"""
 三、选型方案详情
 ---------------
-方案名称: {proposal['proposal_name']}
-方案描述: {proposal['description']}
-选型标准: {proposal['selection_criteria']}
-推荐中间温度: {proposal['operating_temp']}°C
+方案名称: {{ proposal.proposal_name }}
+方案描述: {{ proposal.description }}
+选型标准: {{ proposal.selection_criteria }}
+推荐中间温度: {{ proposal.operating_temp }}°C
 
 四、低温级系统配置 (CO2系统)
 -------------------------
-压缩机型号: {proposal['low_stage']['brand']} {proposal['low_stage']['model']}
-制冷剂类型: {proposal['low_stage']['refrigerant']}
-运行工况: {proposal['low_stage']['evap_temp']}°C → {proposal['low_stage']['cond_temp']}°C
+压缩机型号: {{ proposal.low_stage.brand }} {{ proposal.low_stage.model }}
+制冷剂类型: {{ proposal.low_stage.refrigerant }}
+运行工况: {{ proposal.low_stage.evap_temp }}°C → {{ proposal.low_stage.cond_temp }}°C
 
 单台性能:
-- 制冷量: {proposal['low_stage']['single_capacity_kw']} kW
-- 功率: {proposal['low_stage']['single_power_kw']} kW
-- COP: {proposal['low_stage']['single_cop']}
+- 制冷量: {{ proposal.low_stage.single_capacity_kw }} kW
+- 功率: {{ proposal.low_stage.single_power_kw }} kW
+- COP: {{ proposal.low_stage.single_cop }}
 
 配置方案:
-- 需求台数: {proposal['low_stage']['required_units']} 台
-- 实际配置: {proposal['low_stage']['selected_units']} 台 (N+1冗余)
-- 总制冷量: {proposal['low_stage']['total_capacity_kw']} kW
-- 总功率: {proposal['low_stage']['total_power_kw']} kW
-- 余量百分比: {proposal['low_stage']['capacity_margin_percent']}%
-- 排热量: {proposal['low_stage']['heat_rejection_kw']} kW
+- 需求台数: {{ proposal.low_stage.required_units }} 台
+- 实际配置: {{ proposal.low_stage.selected_units }} 台 (N+1冗余)
+- 总制冷量: {{ proposal.low_stage.total_capacity_kw }} kW
+- 总功率: {{ proposal.low_stage.total_power_kw }} kW
+- 余量百分比: {{ proposal.low_stage.capacity_margin_percent }}%
+- 排热量: {{ proposal.low_stage.heat_rejection_kw }} kW
 
 五、高温级系统配置 (比泽尔系统)
 ---------------------------
-压缩机型号: {proposal['high_stage']['brand']} {proposal['high_stage']['model']}
-制冷剂类型: {proposal['high_stage']['refrigerant']}
-运行工况: {proposal['high_stage']['evap_temp']}°C → {proposal['high_stage']['cond_temp']}°C
+压缩机型号: {{ proposal.high_stage.brand }} {{ proposal.high_stage.model }}
+制冷剂类型: {{ proposal.high_stage.refrigerant }}
+运行工况: {{ proposal.high_stage.evap_temp }}°C → {{ proposal.high_stage.cond_temp }}°C
 
 单台性能:
-- 制冷量: {proposal['high_stage']['single_capacity_kw']} kW
-- 功率: {proposal['high_stage']['single_power_kw']} kW
-- COP: {proposal['high_stage']['single_cop']}
+- 制冷量: {{ proposal.high_stage.single_capacity_kw }} kW
+- 功率: {{ proposal.high_stage.single_power_kw }} kW
+- COP: {{ proposal.high_stage.single_cop }}
 
 配置方案:
-- 配置数量: {proposal['high_stage']['selected_units']} 台
-- 总制冷量: {proposal['high_stage']['total_capacity_kw']} kW
-- 总功率: {proposal['high_stage']['total_power_kw']} kW
-- 余量百分比: {proposal['high_stage']['capacity_margin_percent']}%
+- 配置数量: {{ proposal.high_stage.selected_units }} 台
+- 总制冷量: {{ proposal.high_stage.total_capacity_kw }} kW
+- 总功率: {{ proposal.high_stage.total_power_kw }} kW
+- 余量百分比: {{ proposal.high_stage.capacity_margin_percent }}%
 
 六、复叠系统整体性能
 -------------------
-总制冷量: {proposal['system_performance']['total_cooling_capacity_kw']} kW
-系统总功率: {proposal['system_performance']['total_power_consumption_kw']} kW
-系统COP: {proposal['system_performance']['system_cop']}
-能量流效率: {proposal['system_performance']['energy_flow_efficiency']}
+总制冷量: {{ proposal.system_performance.total_cooling_capacity_kw }} kW
+系统总功率: {{ proposal.system_performance.total_power_consumption_kw }} kW
+系统COP: {{ proposal.system_performance.system_cop }}
+能量流效率: {{ proposal.system_performance.energy_flow_efficiency }}
 
 能耗估算:
 - 年运行时间: 12小时/天 × 360天 = 4320小时
-- 年耗电量: {proposal['system_performance']['annual_energy_consumption_kwh']:,} 度
-- 年电费成本: ¥{proposal['system_performance']['annual_electricity_cost']:,} (按0.8元/度)
+- 年耗电量: {{ '{:,}'.format(proposal.system_performance.annual_energy_consumption_kwh) }} 度
+- 年电费成本: ¥{{ '{:,}'.format(proposal.system_performance.annual_electricity_cost) }} (按0.8元/度)
 
 七、投资成本分析
 ---------------
-低温级压缩机投资: ¥{proposal['low_stage']['total_price']:,}
-高温级压缩机投资: ¥{proposal['high_stage']['total_price']:,}
-压缩机总投资: ¥{proposal['system_performance']['total_compressor_cost']:,}
+低温级压缩机投资: ¥{{ '{:,}'.format(proposal.low_stage.total_price) }}
+高温级压缩机投资: ¥{{ '{:,}'.format(proposal.high_stage.total_price) }}
+压缩机总投资: ¥{{ '{:,}'.format(proposal.system_performance.total_compressor_cost) }}
 
 八、设计说明
 -----------
@@ -1684,9 +1730,416 @@ def generate_detailed_proposal_report(proposal, project_info, low_temp_rooms):
 
 ============================
 报告生成完成
-"""
+""", trim_blocks=True, lstrip_blocks=True, keep_trailing_newline=True)
+
+def generate_detailed_proposal_report(proposal, project_info, low_temp_rooms, totals=None, now=None):
+    """生成详细提案报告，totals为已汇总的 (低温设备负荷, 低温机械负荷)，now为报告生成时间，未提供时自动计算"""
+    if now is None:
+        now = datetime.now()
+    if totals is None:
+        totals = (sum(r.get('equipment_load_kw', 0) for r in low_temp_rooms),
+                  sum(r.get('mechanical_load_kw', 0) for r in low_temp_rooms))
+
+    return _REPORT_TMPL.render(
+        proposal=proposal,
+        project_info=project_info,
+        low_temp_rooms=low_temp_rooms,
+        now=now,
+        total_low_load=totals[0],
+    )
+
+# 提案卡片徽标（按提案位置依次为：能效优先、经济优选、均衡备选方案）
+_PROPOSAL_BADGES = (
+    ('performance-badge', '性能优先'),
+    ('cost-badge', '经济优选'),
+    ('balanced-badge', '备选方案1'),
+    ('balanced-badge', '备选方案2'),
+)
+
+# 提案卡片HTML模板
+_CARD_TMPL = """<div class="proposal-card {selected_class}">
+    <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 1rem;">
+        <h4 style="margin: 0;">{proposal_name}</h4>
+        <span class="{badge_class}">{badge_text}</span>
+    </div>
+    <p style="color: #666; margin-bottom: 1rem;">{description}</p>
+    <div style="background-color: #e9ecef; padding: 0.75rem; border-radius: 6px; margin-bottom: 1rem;">
+        <strong>关键指标:</strong> {key_feature}
+    </div>
+    <div style="display: flex; justify-content: space-between;">
+        <div>
+            <div style="font-size: 0.875rem; color: #6c757d;">系统COP</div>
+            <div style="font-size: 1.25rem; font-weight: bold; color: #2e86ab;">
+                {cop}
+            </div>
+        </div>
+        <div>
+            <div style="font-size: 0.875rem; color: #6c757d;">总投资</div>
+            <div style="font-size: 1.25rem; font-weight: bold; color: #28a745;">
+                {cost}
+            </div>
+        </div>
+    </div>
+</div>"""
+
+# 冷间热负荷与冷风机选型汇总表的列顺序
+_SUMMARY_COLS = (
+    '序号', '冷间名称', '冷间类型', '温度(°C)', '尺寸(m)', '体积(m³)',
+    '除霜方式', '原始设备负荷(kW)', '原始机械负荷(kW)',
+    '校正设备负荷(kW)', '校正机械负荷(kW)',
+    '冷风机型号', '冷风机系列', '冷风机工况', '冷风机数量',
+    '单台制冷量(kW)', '总制冷量(kW)', '余量(%)',
+    '总风机功率(kW)', '总化霜功率(kW)', '总功率(kW)', '选型状态'
+)
+
+
+# "重新选型"时需要清除的选型状态
+SESSION_KEYS_TO_CLEAR = ('selected_proposal_idx', 'proposals')
+
+# 雷达图前端配置：随容器自适应，隐藏工具栏
+_RADAR_CONFIG = {'responsive': True, 'displayModeBar': False}
+
+
+@st.cache_data
+def build_radar(radar_rows):
+    """构建方案对比雷达图，radar_rows为 (方案名称, COP, 成本效益, 能耗效益) 标准化数据元组"""
+    # plotly仅在绘制雷达图时导入，减少页面冷启动耗时
+    import plotly.graph_objects as go
+
+    fig = go.Figure(data=[
+        go.Scatterpolar(
+            r=[cop_value, cost_value, energy_value],
+            theta=['COP', '成本效益', '能耗效益'],
+            name=name,
+            fill='toself'
+        )
+        for name, cop_value, cost_value, energy_value in radar_rows
+    ])
+
+    fig.update_layout(
+        polar=dict(radialaxis=dict(visible=True, range=[0, 1])),
+        title="方案综合对比雷达图",
+        showlegend=True,
+        # 固定uirevision并关闭过渡动画，页面重跑时前端增量更新图表而非整体重绘
+        uirevision='radar',
+        transition=dict(duration=0)
+    )
+    return fig
+
+
+@st.fragment
+def render_proposal(proposal, project_info, low_temp_rooms, totals):
+    """显示选中提案的系统配置、性能汇总、成本分析及导出按钮（片段内交互只重跑本函数）"""
+    # 辅助设备选型结果只取一次，供配置、成本及详情各部分复用
+    perf = proposal['system_performance']
+    plate = perf.get('plate_heat_exchanger')
+    plate_selected = bool(plate and plate['selected'])
+    plate_price = plate['total_price_yuan'] if plate_selected else 0
+    condenser = perf.get('evaporative_condenser')
+    condenser_selected = bool(condenser and condenser['selected'])
+    condenser_price = condenser['total_price_yuan'] if condenser_selected else 0
+
+    # 显示系统配置
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.markdown('<div class="cascade-system">', unsafe_allow_html=True)
+        st.subheader("❄️ 低温级系统 (CO2)")
+        low_stage = proposal['low_stage']
+
+        # 合并为一个markdown元素输出，减少前端元素数量
+        lines = [
+            f"**压缩机:** {low_stage['brand']} {low_stage['model']}",
+            f"**制冷剂:** {low_stage['refrigerant']}",
+            f"**运行工况:** {low_stage['evap_temp']}°C → {low_stage['cond_temp']}°C",
+            f"**单台能力:** {low_stage['single_capacity_kw']} kW",
+            f"**单台功率:** {low_stage['single_power_kw']} kW",
+            f"**单台COP:** {low_stage['single_cop']}",
+            f"**配置数量:** {low_stage['selected_units']} 台 (N+1冗余)",
+            f"**总能力:** {low_stage['total_capacity_kw']} kW",
+            f"**余量:** {low_stage['capacity_margin_percent']}%",
+            f"**排热量:** {low_stage['heat_rejection_kw']} kW",
+            f"**低温级总价:** ¥{low_stage['total_price']:,}",
+        ]
+        st.markdown("  \n".join(lines))
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with col2:
+        st.markdown('<div class="cascade-system">', unsafe_allow_html=True)
+        st.subheader("🔥 高温级系统 (比泽尔)")
+        high_stage = proposal['high_stage']
+
+        lines = [
+            f"**压缩机:** {high_stage['brand']} {high_stage['model']}",
+            f"**制冷剂:** {high_stage['refrigerant']}",
+            f"**运行工况:** {high_stage['evap_temp']}°C → {high_stage['cond_temp']}°C",
+            f"**单台能力:** {high_stage['single_capacity_kw']} kW",
+            f"**单台功率:** {high_stage['single_power_kw']} kW",
+            f"**单台COP:** {high_stage['single_cop']}",
+            f"**配置数量:** {high_stage['selected_units']} 台",
+            f"**总能力:** {high_stage['total_capacity_kw']} kW",
+            f"**余量:** {high_stage['capacity_margin_percent']}%",
+            f"**高温级总价:** ¥{high_stage['total_price']:,}",
+        ]
+        st.markdown("  \n".join(lines))
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with col3:
+        st.markdown('<div class="cascade-system">', unsafe_allow_html=True)
+        st.subheader("⚙️ 辅助设备选型")
+
+        # 显示板换选型结果
+        if plate_selected:
+            lines = [
+                "**板式换热器:**",
+                f"型号: {plate['model']}",
+                f"换热量: {plate['heat_exchange_capacity_kw']} kW",
+                f"板换数量: {plate['plate_count']}",
+                f"制冷泵: {plate['pump_count']} × {plate['pump_power_kw']}kW",
+                f"价格: ¥{plate_price:,}",
+            ]
+            st.markdown("  \n".join(lines))
+        else:
+            st.markdown("⚠️ 板换未选型")
+        st.markdown("---")
+
+        # 显示蒸发冷选型结果
+        if condenser_selected:
+            lines = [
+                "**蒸发式冷凝器:**",
+                f"型号: {condenser['model']}",
+                f"排热量: {condenser['heat_rejection_capacity_kw']} kW",
+                f"数量: {condenser['required_count']}",
+                f"单价: ¥{condenser['unit_price_yuan']:,}",
+                f"总价: ¥{condenser_price:,}",
+            ]
+            st.markdown("  \n".join(lines))
+        else:
+            st.markdown("⚠️ 蒸发冷未选型")
+        st.markdown("---")
+
+        # 排热量分析
+        if 'heat_rejection_analysis' in perf:
+            heat = perf['heat_rejection_analysis']
+            lines = [
+                "**排热量分析:**",
+                f"低温级: {heat['low_stage_heat_rejection']} kW",
+                f"高温级: {heat['high_stage_heat_rejection']} kW",
+                f"总计: {heat['total_heat_rejection']} kW",
+            ]
+            st.markdown("  \n".join(lines))
+
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    # 系统性能汇总
+    st.markdown("### 📊 系统性能汇总")
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("总制冷量", f"{perf['total_cooling_capacity_kw']:.1f} kW")
+    with col2:
+        st.metric("系统COP", f"{perf['system_cop']:.3f}")
+    with col3:
+        st.metric("总功率", f"{perf['total_power_consumption_kw']:.1f} kW")
+    with col4:
+        st.metric("年能耗", f"{perf['annual_energy_consumption_kwh']:,} 度")
+
+    # 成本分析
+    st.markdown("### 💰 成本分析")
+
+    auxiliary_cost = plate_price + condenser_price
+    compressor_cost = perf['total_compressor_cost']
+    budget_yuan = project_info['budget_limit'] * 10000
+    total_investment = compressor_cost + auxiliary_cost
+    budget_utilization = (compressor_cost / budget_yuan) * 100
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("压缩机总投资", f"¥{compressor_cost:,}")
+    with col2:
+        st.metric("辅助设备投资", f"¥{auxiliary_cost:,}")
+    with col3:
+        st.metric("总投资", f"¥{total_investment:,}")
+    with col4:
+        st.metric("预算利用率", f"{budget_utilization:.1f}%")
+
+    if budget_utilization <= 100:
+        st.success(f"✅ 总投资在预算范围内，剩余 ¥{budget_yuan - total_investment:,.0f}")
+    else:
+        st.warning(f"⚠️ 总投资超支 ¥{total_investment - budget_yuan:,.0f}")
+
+    # 详细辅助设备信息展开部分
+    with st.expander("📋 查看辅助设备详细信息"):
+        col1, col2 = st.columns(2)
+
+        with col1:
+            if plate_selected:
+                st.markdown("#### 板式换热器详情")
+                details = plate['details']
+                lines = [
+                    f"**型号:** {plate['model']}",
+                    f"**换热量:** {plate['heat_exchange_capacity_kw']} kW",
+                    f"**需求负荷:** {plate['required_capacity_kw']} kW",
+                    f"**板换数量:** {plate['plate_count']}",
+                    f"**制冷泵配置:** {plate['pump_count']}台 × {plate['pump_power_kw']}kW",
+                    "**管道接口:**",
+                ]
+                blocks = ["  \n".join(lines)]
+                if '氟利昂进口管径' in details:
+                    # 管道接口以列表形式显示，与前后段落之间用空行分隔
+                    blocks.append("\n".join([
+                        f"- 氟利昂进口: {details['氟利昂进口管径']}",
+                        f"- CO2进口: {details['CO2进口管径']}",
+                        f"- CO2出口: {details['CO2出口管径']}",
+                        f"- CO2回液口: {details['CO2回液口管径']}",
+                    ]))
+                blocks.append("  \n".join([
+                    f"**尺寸:** {details.get('长(mm)', '')}×{details.get('宽(mm)', '')}×{details.get('高(mm)', '')} mm",
+                    f"**价格:** ¥{plate_price:,}",
+                ]))
+                st.markdown("\n\n".join(blocks))
+
+        with col2:
+            if condenser_selected:
+                st.markdown("#### 蒸发式冷凝器详情")
+                details = condenser['details']
+                lines = [
+                    f"**型号:** {condenser['model']}",
+                    f"**排热量:** {condenser['heat_rejection_capacity_kw']} kW",
+                    f"**需求排热量:** {condenser['required_heat_rejection_kw']} kW",
+                    f"**配置数量:** {condenser['required_count']}台",
+                    f"**风机功率:** {details.get('轴流风机功率KW', '')}",
+                    f"**循环水泵功率:** {details.get('循环水泵功率KW', '')}",
+                    f"**总功率:** {details.get('总功率KW', '')} kW",
+                    f"**价格:** ¥{condenser_price:,}",
+                ]
+                st.markdown("  \n".join(lines))
+
+    # 导出按钮
+    st.markdown("### 💾 导出设计方案")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        if st.button("📄 生成详细报告", use_container_width=True):
+            # 片段重跑不会更新main()中的时间，报告时间在点击时获取
+            now = datetime.now()
+            report = generate_detailed_proposal_report(
+                proposal, project_info, low_temp_rooms,
+                totals=totals,
+                now=now
+            )
+            st.download_button(
+                label="下载报告",
+                data=report,
+                file_name=f"复叠系统设计方案_{proposal['proposal_name']}_{now.strftime('%Y%m%d_%H%M')}.txt",
+                mime="text/plain"
+            )
+    with col2:
+        if st.button("🔄 重新选型", use_container_width=True):
+            for key in SESSION_KEYS_TO_CLEAR:
+                st.session_state.pop(key, None)
+            st.rerun(scope="app")
+    with col3:
+        if st.button("🏠 返回首页", use_container_width=True):
+            st.switch_page("cold_storage_input_interface.py")
+
+
+@st.cache_resource
+def _load_css():
+    """读取页面样式表（每个进程只读取一次）"""
+    css_path = os.path.join(os.path.dirname(current_file), 'static', 'design_page.css')
+    with open(css_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@st.cache_data(show_spinner=False)
+def _compute_heat_loads(rooms_data, project_info):
+    """热负荷批量计算（按冷间与项目参数缓存，重跑页面时不重复计算）"""
+    heat_load_calculator = HeatLoadCalculator()
+    return heat_load_calculator.calculate_multiple_rooms(
+        rooms_data=copy.deepcopy(rooms_data),
+        project_info=project_info
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _compute_cold_fan_selections(rooms_data, project_info, room_results):
+    """冷风机选型与动态负荷校正（按输入缓存），返回 (冷风机选型列表, 校正结果)"""
+    # 校正过程会写回房间数据，使用副本避免修改调用方数据
+    rooms_data = copy.deepcopy(rooms_data)
+    # 冷间重名时取第一个同名冷间，与动态负荷校正的写回对象一致
+    rooms_by_name = {room['room_name']: room for room in reversed(rooms_data)}
+
+    cold_fan_selector = IntelligentColdFanSelector()
+    dynamic_corrector = DynamicLoadCorrector(HeatLoadCalculator())
+
+    # 为每个冷间选择冷风机
+    cold_fan_selections = []
+
+    for room_name, room_result in room_results.items():
+        equipment_load_kw = room_result['equipment_load_kw']
+
+        # 找到对应的房间温度
+        room_data = rooms_by_name.get(room_name)
+
+        if room_data is not None:
+            # 从房间数据中获取除霜方式
+            defrost_method = room_data.get('defrost_method', '电热除霜')  # 默认值
+
+            selection_result = cold_fan_selector.select_cold_fan_by_conditions(
+                required_capacity_kw=equipment_load_kw,
+                room_temp=room_data['temperature'],
+                defrost_method=defrost_method  # 传递除霜方式
+            )
+
+            if selection_result['selected']:
+                cold_fan_selections.append({
+                    'room_name': room_name,
+                    'room_temp': room_data['temperature'],
+                    'equipment_load_kw': equipment_load_kw,
+                    'defrost_method': defrost_method,  # 保存除霜方式
+                    'selection_result': selection_result
+                })
+
+    # 动态校正热负荷
+    corrected_results = dynamic_corrector.correct_heat_load(
+        rooms_data, cold_fan_selections, project_info
+    )
+
+    return cold_fan_selections, corrected_results
+
+
+@st.cache_data(show_spinner=False)
+def _summary_csv_bytes(df_hash, _df):
+    """汇总表CSV编码（按数据哈希缓存，数据不变时重跑页面不重复序列化）"""
+    buffer = BytesIO()
+    _df.to_csv(buffer, index=False, encoding='utf-8-sig')
+    return buffer.getvalue()
+
+
+@st.cache_data(show_spinner=False)
+def _generate_proposals(low_temp_load_kw, room_temp, ambient_temp):
+    """生成三种提案（按负荷与温度条件缓存，切换方案卡片时直接复用）"""
+    bi_selector = BusinessIntelligenceSelector()
+    proposals = bi_selector.generate_proposals(
+        low_temp_load_kw=low_temp_load_kw,
+        room_temp=room_temp,
+        ambient_temp=ambient_temp
+    )
+
+    # 预先格式化卡片展示用的字符串，随提案一起缓存
+    for proposal in proposals:
+        if proposal:
+            performance = proposal['system_performance']
+            proposal['_display'] = {
+                'cop': f"{performance['system_cop']:.2f}",
+                'cost': f"¥{performance['total_compressor_cost']:,}",
+                'energy': f"{performance['annual_energy_consumption_kwh']:,}"
+            }
+
+    return proposals
 
-    return report
 
 def main():
     st.set_page_config(
@@ -1696,81 +2149,15 @@ def main():
         initial_sidebar_state="expanded"
     )
 
+    # 本次页面运行的统一时间戳（下载文件名与报告生成时间保持一致）
+    now = datetime.now()
+
     # 初始化session_state中的选择状态
     if 'selected_proposal_idx' not in st.session_state:
         st.session_state.selected_proposal_idx = -1  # -1表示未选择
-    if 'selected_proposal' not in st.session_state:
-        st.session_state.selected_proposal = None
 
     # 自定义CSS样式
-    st.markdown("""
-    <style>
-    .main-header {
-        font-size: 2.5rem;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .section-header {
-        font-size: 1.5rem;
-        color: #2e86ab;
-        border-bottom: 2px solid #2e86ab;
-        padding-bottom: 0.5rem;
-        margin-top: 2rem;
-    }
-    .proposal-card {
-        background-color: #f8f9fa;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border: 2px solid #dee2e6;
-        margin-bottom: 1rem;
-        transition: all 0.3s;
-    }
-    .proposal-card:hover {
-        border-color: #2e86ab;
-        box-shadow: 0 4px 12px rgba(0,0,0,0.1);
-    }
-    .proposal-card.selected {
-        border-color: #28a745;
-        background-color: #e8f5e8;
-    }
-    .performance-badge {
-        background-color: #17a2b8;
-        color: white;
-        padding: 0.25rem 0.75rem;
-        border-radius: 12px;
-        font-size: 0.875rem;
-    }
-    .cost-badge {
-        background-color: #ffc107;
-        color: #212529;
-        padding: 0.25rem 0.75rem;
-        border-radius: 12px;
-        font-size: 0.875rem;
-    }
-    .balanced-badge {
-        background-color: #28a745;
-        color: white;
-        padding: 0.25rem 0.75rem;
-        border-radius: 12px;
-        font-size: 0.875rem;
-    }
-    .equipment-card {
-        background-color: #f0f8ff;
-        padding: 1rem;
-        border-radius: 8px;
-        border-left: 4px solid #2e86ab;
-        margin-bottom: 0.5rem;
-    }
-    .cascade-system {
-        background-color: #e8f5e8;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border: 2px solid #4caf50;
-        margin-bottom: 1rem;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(f"<style>{_load_css()}</style>", unsafe_allow_html=True)
 
     # 页面标题
     st.markdown(
@@ -1795,6 +2182,16 @@ def main():
 
     project_info = design_data['project_info']
     rooms_data = design_data['rooms_data']
+    # 冷间重名时取第一个同名冷间，与动态负荷校正的写回对象一致
+    rooms_by_name = {room['room_name']: room for room in reversed(rooms_data)}
+    # 冷间几何信息一次性计算：与rooms_data按索引对应的 (体积, 尺寸字符串)，冷间重名时互不覆盖
+    room_geom = [
+        (
+            room['length'] * room['width'] * room['height'],
+            f"{room['length']}×{room['width']}×{room['height']}"
+        )
+        for room in rooms_data
+    ]
 
     st.success(f"✅ 成功加载项目: **{project_info['project_name']}**")
 
@@ -1803,7 +2200,7 @@ def main():
     with col1:
         st.metric("冷间数量", len(rooms_data))
     with col2:
-        total_volume = sum(room['length'] * room['width'] * room['height'] for room in rooms_data)
+        total_volume = sum(volume for volume, _ in room_geom)
         st.metric("总体积", f"{total_volume:.0f} m³")
     with col3:
         st.metric("设计优先级", project_info['design_priority'])
@@ -1815,14 +2212,8 @@ def main():
 
     with st.spinner("正在计算热负荷..."):
         try:
-            # 初始化热负荷计算器
-            heat_load_calculator = HeatLoadCalculator()
-
             # 批量计算所有冷间的热负荷
-            summary_result = heat_load_calculator.calculate_multiple_rooms(
-                rooms_data=rooms_data,
-                project_info=project_info
-            )
+            summary_result = _compute_heat_loads(rooms_data, project_info)
 
             # 提取结果
             room_results = summary_result.get('room_results', {})
@@ -1854,51 +2245,14 @@ def main():
 
     with st.spinner("正在进行冷风机选型..."):
         try:
-            # 初始化冷风机选择器
-            cold_fan_selector = IntelligentColdFanSelector()
-            dynamic_corrector = DynamicLoadCorrector(heat_load_calculator)
-
-            # 为每个冷间选择冷风机
-            cold_fan_selections = []
+            # 冷风机选型及动态校正热负荷
+            cold_fan_selections, corrected_results = _compute_cold_fan_selections(
+                rooms_data, project_info, room_results
+            )
 
             # 创建一个容器来显示所有冷间的详细信息
             st.markdown("### 📋 各冷间热负荷及冷风机选型结果")
 
-            for idx, (room_name, room_result) in enumerate(room_results.items()):
-                equipment_load_kw = room_result['equipment_load_kw']
-                mechanical_load_kw = room_result.get('mechanical_load_kw', 0)
-
-                # 找到对应的房间温度
-                room_data = None
-                for room in rooms_data:
-                    if room['room_name'] == room_name:
-                        room_data = room
-                        break
-
-                if room_data is not None:
-                    # 从房间数据中获取除霜方式
-                    defrost_method = room_data.get('defrost_method', '电热除霜')  # 默认值
-
-                    selection_result = cold_fan_selector.select_cold_fan_by_conditions(
-                        required_capacity_kw=equipment_load_kw,
-                        room_temp=room_data['temperature'],
-                        defrost_method=defrost_method  # 传递除霜方式
-                    )
-
-                    if selection_result['selected']:
-                        cold_fan_selections.append({
-                            'room_name': room_name,
-                            'room_temp': room_data['temperature'],
-                            'equipment_load_kw': equipment_load_kw,
-                            'defrost_method': defrost_method,  # 保存除霜方式
-                            'selection_result': selection_result
-                        })
-
-            # 动态校正热负荷
-            corrected_results = dynamic_corrector.correct_heat_load(
-                rooms_data, cold_fan_selections, project_info
-            )
-
             # 更新热负荷结果
             st.session_state.corrected_heat_load_results = corrected_results
             st.session_state.cold_fan_selections = cold_fan_selections
@@ -1925,13 +2279,15 @@ def main():
 
     st.markdown('<h2 class="section-header">📊 冷间热负荷与冷风机选型汇总</h2>', unsafe_allow_html=True)
 
-    # 创建汇总数据表格
-    summary_data = []
+    # 创建汇总数据表格（按_SUMMARY_COLS顺序逐行生成元组）
+    summary_rows = []
+    fan_by_room = {selection['room_name']: selection['selection_result'] for selection in cold_fan_selections}
+    corrected_room_results = st.session_state.get('corrected_heat_load_results', {}).get('room_results', {})
 
     # 获取所有房间的数据
     for idx, room in enumerate(rooms_data):
         room_name = room['room_name']
-        room_type = room.get('room_type', '冷冻冷藏间')
+        room_volume, room_dims = room_geom[idx]
 
         # 获取热负荷数据
         if room_name in room_results:
@@ -1941,85 +2297,55 @@ def main():
             equipment_load = 0
             mechanical_load = 0
 
-        # 获取冷风机选型结果
-        fan_selection = None
-        for selection in cold_fan_selections:
-            if selection['room_name'] == room_name:
-                fan_selection = selection['selection_result']
-                break
-
         # 获取校正后的热负荷
-        corrected_result = None
-        if 'corrected_heat_load_results' in st.session_state:
-            corrected_results = st.session_state.corrected_heat_load_results
-            corrected_room_results = corrected_results.get('room_results', {})
-            if room_name in corrected_room_results:
-                corrected_result = corrected_room_results[room_name]
-
-        # 构建汇总数据
-        row_data = {
-            '序号': idx + 1,
-            '冷间名称': room_name,
-            '冷间类型': room_type,
-            '温度(°C)': room['temperature'],
-            '尺寸(m)': f"{room['length']}×{room['width']}×{room['height']}",
-            '体积(m³)': round(room['length'] * room['width'] * room['height'], 1),
-            '除霜方式': room.get('defrost_method', '电热除霜'),
-            '原始设备负荷(kW)': round(equipment_load, 1),
-            '原始机械负荷(kW)': round(mechanical_load, 1),
-        }
-
-        # 添加校正后的负荷
+        corrected_result = corrected_room_results.get(room_name)
         if corrected_result:
-            row_data['校正设备负荷(kW)'] = round(corrected_result.get('equipment_load_kw', 0), 1)
-            row_data['校正机械负荷(kW)'] = round(corrected_result.get('mechanical_load_kw', 0), 1)
+            corrected_equipment_load = round(corrected_result.get('equipment_load_kw', 0), 1)
+            corrected_mechanical_load = round(corrected_result.get('mechanical_load_kw', 0), 1)
+        else:
+            corrected_equipment_load = np.nan
+            corrected_mechanical_load = np.nan
+
+        # 获取冷风机选型结果
+        fan_selection = fan_by_room.get(room_name)
 
-        # 添加冷风机选型信息
         if fan_selection and fan_selection['selected']:
-            row_data.update({
-                '冷风机型号': fan_selection['model'],
-                '冷风机系列': fan_selection['series'],
-                '冷风机工况': fan_selection['condition'],
-                '冷风机数量': f"{fan_selection['units']}台",
-                '单台制冷量(kW)': round(fan_selection['single_capacity_kw'], 1),
-                '总制冷量(kW)': round(fan_selection['total_capacity_kw'], 1),
-                '余量(%)': round(fan_selection['excess_percent'], 1),
-                '总风机功率(kW)': round(fan_selection['total_fan_power_kw'], 1),
-                '总化霜功率(kW)': round(fan_selection['total_defrost_power_kw'], 1),
-                '总功率(kW)': round(fan_selection['total_power_kw'], 1),
-                '选型状态': '✅ 已选型'
-            })
+            fan_fields = (
+                fan_selection['model'],
+                fan_selection['series'],
+                fan_selection['condition'],
+                f"{fan_selection['units']}台",
+                round(fan_selection['single_capacity_kw'], 1),
+                round(fan_selection['total_capacity_kw'], 1),
+                round(fan_selection['excess_percent'], 1),
+                round(fan_selection['total_fan_power_kw'], 1),
+                round(fan_selection['total_defrost_power_kw'], 1),
+                round(fan_selection['total_power_kw'], 1),
+                '✅ 已选型'
+            )
         else:
-            row_data.update({
-                '冷风机型号': '待选型',
-                '冷风机数量': '-',
-                '单台制冷量(kW)': '-',
-                '总制冷量(kW)': '-',
-                '余量(%)': '-',
-                '总风机功率(kW)': '-',
-                '总化霜功率(kW)': '-',
-                '总功率(kW)': '-',
-                '选型状态': '❌ 未选型'
-            })
+            fan_fields = (
+                '待选型', None, None, '-',
+                np.nan, np.nan, np.nan, np.nan, np.nan, np.nan,
+                '❌ 未选型'
+            )
 
-        summary_data.append(row_data)
+        summary_rows.append((
+            idx + 1,
+            room_name,
+            room.get('room_type', '冷冻冷藏间'),
+            room['temperature'],
+            room_dims,
+            round(room_volume, 1),
+            room.get('defrost_method', '电热除霜'),
+            round(equipment_load, 1),
+            round(mechanical_load, 1),
+            corrected_equipment_load,
+            corrected_mechanical_load,
+        ) + fan_fields)
 
     # 创建DataFrame
-    summary_df = pd.DataFrame(summary_data)
-
-    # 重新排序列顺序
-    column_order = [
-        '序号', '冷间名称', '冷间类型', '温度(°C)', '尺寸(m)', '体积(m³)',
-        '除霜方式', '原始设备负荷(kW)', '原始机械负荷(kW)',
-        '校正设备负荷(kW)', '校正机械负荷(kW)',
-        '冷风机型号', '冷风机系列', '冷风机工况', '冷风机数量',
-        '单台制冷量(kW)', '总制冷量(kW)', '余量(%)',
-        '总风机功率(kW)', '总化霜功率(kW)', '总功率(kW)', '选型状态'
-    ]
-
-    # 只保留实际存在的列
-    existing_columns = [col for col in column_order if col in summary_df.columns]
-    summary_df = summary_df[existing_columns]
+    summary_df = pd.DataFrame.from_records(summary_rows, columns=_SUMMARY_COLS)
 
     # 显示汇总表格
     st.markdown("### 📋 热负荷与冷风机选型汇总表")
@@ -2060,6 +2386,12 @@ def main():
 
     col1, col2, col3, col4, col5 = st.columns(5)
 
+    # 数值列保持为数值类型（未选型为NaN），一次性汇总
+    totals = summary_df[[
+        '原始设备负荷(kW)', '校正设备负荷(kW)', '原始机械负荷(kW)', '校正机械负荷(kW)',
+        '总风机功率(kW)', '总化霜功率(kW)', '总制冷量(kW)'
+    ]].sum()
+
     with col1:
         total_rooms = len(summary_df)
         selected_fans = len(summary_df[summary_df['选型状态'] == '✅ 已选型'])
@@ -2067,29 +2399,27 @@ def main():
         st.metric("已选型冷间", selected_fans)
 
     with col2:
-        total_original_load = summary_df['原始设备负荷(kW)'].replace('-', 0).astype(float).sum()
-        total_corrected_load = summary_df['校正设备负荷(kW)'].replace('-', 0).astype(
-            float).sum() if '校正设备负荷(kW)' in summary_df.columns else 0
+        total_original_load = totals['原始设备负荷(kW)']
+        total_corrected_load = totals['校正设备负荷(kW)']
         st.metric("原始设备负荷", f"{total_original_load:.1f} kW")
         if total_corrected_load > 0:
             st.metric("校正设备负荷", f"{total_corrected_load:.1f} kW")
 
     with col3:
-        total_original_mech_load = summary_df['原始机械负荷(kW)'].replace('-', 0).astype(float).sum()
-        total_corrected_mech_load = summary_df['校正机械负荷(kW)'].replace('-', 0).astype(
-            float).sum()if '校正机械负荷(kW)' in summary_df.columns else 0
+        total_original_mech_load = totals['原始机械负荷(kW)']
+        total_corrected_mech_load = totals['校正机械负荷(kW)']
         st.metric("原始机械负荷", f"{total_original_mech_load:.1f} kW")
         if total_corrected_mech_load > 0:
             st.metric("校正机械负荷",f"{total_corrected_mech_load:.1f} kW")
 
     with col4:
-        total_fan_power = summary_df['总风机功率(kW)'].replace('-', 0).astype(float).sum()
-        total_defrost_power = summary_df['总化霜功率(kW)'].replace('-', 0).astype(float).sum()
+        total_fan_power = totals['总风机功率(kW)']
+        total_defrost_power = totals['总化霜功率(kW)']
         st.metric("总风机功率", f"{total_fan_power:.1f} kW")
         st.metric("总化霜功率", f"{total_defrost_power:.1f} kW")
 
     with col5:
-        total_capacity = summary_df['总制冷量(kW)'].replace('-', 0).astype(float).sum()
+        total_capacity = totals['总制冷量(kW)']
         if total_capacity > 0 and total_original_load > 0:
             overall_margin = ((total_capacity - total_original_load) / total_original_load) * 100
             st.metric("总制冷量", f"{total_capacity:.1f} kW")
@@ -2099,23 +2429,17 @@ def main():
     st.markdown("### 📈 按冷间类型统计")
 
     if '冷间类型' in summary_df.columns:
-        type_stats = summary_df.groupby('冷间类型').agg({
-            '序号': 'count',
-            '温度(°C)': 'mean',
-            '原始设备负荷(kW)': 'sum',
-            '校正设备负荷(kW)': 'sum' if '校正设备负荷(kW)' in summary_df.columns else None,
-            '原始机械负荷(kW)': 'sum',
-            '校正机械负荷(kW)': 'sum' if '校正机械负荷(kW)' in summary_df.columns else None
-        }).reset_index()
-
-        type_stats = type_stats.rename(columns={
-            '序号': '冷间数量',
-            '温度(°C)': '平均温度(°C)',
-            '原始设备负荷(kW)': '原始设备负荷(kW)',
-            '校正设备负荷(kW)': '校正设备负荷(kW)',
-            '原始机械负荷(kW)': '原始机械负荷(kW)',
-            '校正机械负荷(kW)': '校正机械负荷(kW)'
-        })
+        # 聚合时直接命名输出列
+        agg_map = {
+            '冷间数量': pd.NamedAgg(column='序号', aggfunc='count'),
+            '平均温度(°C)': pd.NamedAgg(column='温度(°C)', aggfunc='mean'),
+            '原始设备负荷(kW)': pd.NamedAgg(column='原始设备负荷(kW)', aggfunc='sum'),
+            '校正设备负荷(kW)': pd.NamedAgg(column='校正设备负荷(kW)', aggfunc='sum'),
+            '原始机械负荷(kW)': pd.NamedAgg(column='原始机械负荷(kW)', aggfunc='sum'),
+            '校正机械负荷(kW)': pd.NamedAgg(column='校正机械负荷(kW)', aggfunc='sum'),
+        }
+
+        type_stats = summary_df.groupby('冷间类型', as_index=False).agg(**agg_map)
 
         st.dataframe(
             type_stats,
@@ -2127,11 +2451,11 @@ def main():
     st.markdown("### 💾 导出汇总数据")
 
     # 创建下载按钮
-    csv = summary_df.to_csv(index=False, encoding='utf-8-sig')
+    csv = _summary_csv_bytes(int(pd.util.hash_pandas_object(summary_df).sum()), summary_df)
     st.download_button(
         label="📥 下载CSV格式汇总表",
         data=csv,
-        file_name=f"冷间热负荷与冷风机选型汇总_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+        file_name=f"冷间热负荷与冷风机选型汇总_{now.strftime('%Y%m%d_%H%M%S')}.csv",
         mime="text/csv"
     )
 
@@ -2139,38 +2463,36 @@ def main():
     st.markdown('<h2 class="section-header">🔄 复叠系统智能选型</h2>', unsafe_allow_html=True)
 
     low_temp_rooms = []
-    low_temp_load_kw = 0
 
     if 'heat_load_results' in st.session_state:
         room_results = st.session_state.corrected_heat_load_results.get('room_results', {})
 
-        # 匹配房间数据
-        for room_name, room_result in room_results.items():
-            # 在原始rooms_data中找到对应的房间
-            room_data = None
-            for room in rooms_data:
-                if room['room_name'] == room_name:
-                    room_data = room
-                    break
+        # 匹配房间数据：先按温度（≤-18°C）筛选，再检查是否为冷冻冷藏间
+        low_temp_rooms = [
+            {
+                'room_name': room_name,
+                'temperature': room_data['temperature'],
+                'equipment_load_kw': room_result['equipment_load_kw'],
+                'mechanical_load_kw': room_result['mechanical_load_kw'],
+                'room_data': room_data
+            }
+            for room_name, room_result in room_results.items()
+            if (room_data := rooms_by_name.get(room_name)) is not None
+            and room_data['temperature'] <= -18
+            and room_data.get('room_type', '冷冻冷藏间') == '冷冻冷藏间'
+        ]
 
-            if room_data and room_data['temperature'] <= -18:
-                # 检查是否为冷冻冷藏间
-                if room_data.get('room_type', '冷冻冷藏间') == '冷冻冷藏间':
-                    equipment_load = room_result['equipment_load_kw']
-                    mechanical_load = room_result['mechanical_load_kw']
-                    low_temp_rooms.append({
-                        'room_name': room_name,
-                        'temperature': room_data['temperature'],
-                        'equipment_load_kw': equipment_load,
-                        'mechanical_load_kw': mechanical_load,
-                        'room_data': room_data
-                    })
-                    low_temp_load_kw += mechanical_load
+    # 一次遍历汇总低温冷间的设备负荷、机械负荷及最低温度
+    total_equipment_load = total_mechanical_load = 0.0
+    min_low_temp = float('inf')
+    for r in low_temp_rooms:
+        total_equipment_load += r['equipment_load_kw']
+        total_mechanical_load += r.get('mechanical_load_kw', 0.0)
+        min_low_temp = min(min_low_temp, r['temperature'])
+    low_temp_load_kw = total_mechanical_load
 
     # 显示识别结果
     if len(low_temp_rooms) > 0:
-        total_equipment_load = sum(r['equipment_load_kw'] for r in low_temp_rooms)
-        total_mechanical_load = sum(r.get('mechanical_load_kw', 0) for r in low_temp_rooms)
         st.info(f"识别到 {len(low_temp_rooms)} 个低温冷间（≤-18°C），总设备负荷: {total_equipment_load:.1f} kW ，总机械负荷: {total_mechanical_load:.1f} kW")
 
         # 创建表格展示低温冷间
@@ -2215,13 +2537,10 @@ def main():
 
     with st.spinner("正在生成三种专业提案..."):
         try:
-            # 初始化商务智能选型引擎
-            bi_selector = BusinessIntelligenceSelector()
-
             # 生成三种提案
-            proposals = bi_selector.generate_proposals(
+            proposals = _generate_proposals(
                 low_temp_load_kw=low_temp_load_kw,
-                room_temp=min([r['temperature'] for r in low_temp_rooms]),
+                room_temp=min_low_temp,
                 ambient_temp=project_info['summer_temp']
             )
 
@@ -2231,11 +2550,7 @@ def main():
             # 显示提案选择界面
             st.markdown("### 🎯 请选择推荐方案")
 
-            # 初始化session_state中的选择状态
-            if 'selected_proposal' not in st.session_state:
-                st.session_state.selected_proposal = proposals[0] if proposals and proposals[0] else None
-
-            # 找到当前选中的提案索引
+            # 找到当前选中的提案索引（session_state只保存索引，提案按索引取用）
             if 'selected_proposal_idx' not in st.session_state:
                 st.session_state.selected_proposal_idx = 0 if proposals else -1
 
@@ -2252,6 +2567,9 @@ def main():
             else:
                 cols = st.columns(3)  # 最多3列
 
+            # 按钮放在各列中，卡片HTML收集后一次性渲染
+            card_html_parts = []
+
             # 确保有足够的列
             for idx, proposal in enumerate(proposals):
                 if idx >= len(cols):
@@ -2260,49 +2578,22 @@ def main():
 
                 if proposal:
                     with cols[idx]:
-                        # 添加提案显示逻辑（保持不变）
-                        badge_class = ""
-                        badge_text = ""
-
-                        if idx == 0:
-                            badge_class = "performance-badge"
-                            badge_text = "性能优先"
-                        elif idx == 1:
-                            badge_class = "cost-badge"
-                            badge_text = "经济优选"
-                        else:
-                            badge_class = "balanced-badge"
-                            badge_text = f"备选方案{idx - 1}"
+                        # 按提案位置取徽标样式与文字
+                        badge_class, badge_text = _PROPOSAL_BADGES[min(idx, len(_PROPOSAL_BADGES) - 1)]
 
                         is_selected = (idx == st.session_state.selected_proposal_idx)
 
                         # 创建提案卡片
-                        card_html = f"""
-                        <div class="proposal-card {'selected' if idx == st.session_state.selected_proposal_idx else ''}">
-                            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 1rem;">
-                                <h4 style="margin: 0;">{proposal['proposal_name']}</h4>
-                                <span class="{badge_class}">{badge_text}</span>
-                            </div>
-                            <p style="color: #666; margin-bottom: 1rem;">{proposal['description']}</p>
-                            <div style="background-color: #e9ecef; padding: 0.75rem; border-radius: 6px; margin-bottom: 1rem;">
-                                <strong>关键指标:</strong> {proposal['key_feature']}
-                            </div>
-                            <div style="display: flex; justify-content: space-between;">
-                                <div>
-                                    <div style="font-size: 0.875rem; color: #6c757d;">系统COP</div>
-                                    <div style="font-size: 1.25rem; font-weight: bold; color: #2e86ab;">
-                                        {proposal['system_performance']['system_cop']:.2f}
-                                    </div>
-                                </div>
-                                <div>
-                                    <div style="font-size: 0.875rem; color: #6c757d;">总投资</div>
-                                    <div style="font-size: 1.25rem; font-weight: bold; color: #28a745;">
-                                        ¥{proposal['system_performance']['total_compressor_cost']:,}
-                                    </div>
-                                </div>
-                            </div>
-                        </div>
-                        """
+                        card_html = _CARD_TMPL.format_map({
+                            'selected_class': 'selected' if is_selected else '',
+                            'proposal_name': proposal['proposal_name'],
+                            'badge_class': badge_class,
+                            'badge_text': badge_text,
+                            'description': proposal['description'],
+                            'key_feature': proposal['key_feature'],
+                            'cop': proposal['_display']['cop'],
+                            'cost': proposal['_display']['cost']
+                        })
 
                         if st.button(f"{'✅ 已选择' if is_selected else '选择此方案'}",
                                      key=f"select_proposal_{idx}",
@@ -2310,14 +2601,22 @@ def main():
                                      type="primary" if is_selected else "secondary"):
                             # 更新session_state中的选择状态
                             st.session_state.selected_proposal_idx = idx
-                            st.session_state.selected_proposal = proposal
                             st.rerun()
 
-                        st.markdown(card_html, unsafe_allow_html=True)
+                    card_html_parts.append(
+                        f'<div style="flex: 1; min-width: 0;">{card_html}</div>'
+                    )
+
+            if card_html_parts:
+                st.markdown(
+                    '<div style="display: flex; gap: 1rem;">' + ''.join(card_html_parts) + '</div>',
+                    unsafe_allow_html=True
+                )
 
             # 显示选中的提案详情
-            if 'selected_proposal' in st.session_state and st.session_state.selected_proposal:
-                proposal = st.session_state.selected_proposal
+            selected_idx = st.session_state.get('selected_proposal_idx', -1)
+            proposal = proposals[selected_idx] if 0 <= selected_idx < len(proposals) else None
+            if proposal:
 
                 # 添加方案比较图表
                 st.markdown("### 📈 方案对比分析")
@@ -2336,222 +2635,25 @@ def main():
                         # 显示比较表格
                         st.dataframe(comparison_df, use_container_width=True, hide_index=True)
 
-                        # 创建雷达图对比
-                        fig = go.Figure()
-
-                        # 标准化数据（0-1范围）
-                        normalized_data = []
-                        for idx, proposal in enumerate(st.session_state.proposals):
-                            if proposal:
-                                norm_cop = proposal['system_performance']['system_cop'] / comparison_df['系统COP'].max()
-                                norm_cost = 1 - (proposal['total_cost'] / comparison_df['总投资(万元)'].max() * 10000) / \
-                                            comparison_df['总投资(万元)'].max()
-                                norm_energy = 1 - (proposal['system_performance']['annual_energy_consumption_kwh'] /
-                                                   comparison_df['年能耗(万度)'].max() * 10000) / comparison_df[
-                                                  '年能耗(万度)'].max()
-
-                                fig.add_trace(go.Scatterpolar(
-                                    r=[norm_cop, norm_cost, norm_energy],
-                                    theta=['COP', '成本效益', '能耗效益'],
-                                    name=proposal['proposal_name'],
-                                    fill='toself'
-                                ))
-
-                        fig.update_layout(
-                            polar=dict(radialaxis=dict(visible=True, range=[0, 1])),
-                            title="方案综合对比雷达图",
-                            showlegend=True
-                        )
-
-                        st.plotly_chart(fig, use_container_width=True)
-
-                # 显示系统配置
-                col1, col2, col3 = st.columns(3)
-
-                with col1:
-                    st.markdown('<div class="cascade-system">', unsafe_allow_html=True)
-                    st.subheader("❄️ 低温级系统 (CO2)")
-                    low_stage = proposal['low_stage']
-
-                    st.write(f"**压缩机:** {low_stage['brand']} {low_stage['model']}")
-                    st.write(f"**制冷剂:** {low_stage['refrigerant']}")
-                    st.write(f"**运行工况:** {low_stage['evap_temp']}°C → {low_stage['cond_temp']}°C")
-                    st.write(f"**单台能力:** {low_stage['single_capacity_kw']} kW")
-                    st.write(f"**单台功率:** {low_stage['single_power_kw']} kW")
-                    st.write(f"**单台COP:** {low_stage['single_cop']}")
-                    st.write(f"**配置数量:** {low_stage['selected_units']} 台 (N+1冗余)")
-                    st.write(f"**总能力:** {low_stage['total_capacity_kw']} kW")
-                    st.write(f"**余量:** {low_stage['capacity_margin_percent']}%")
-                    st.write(f"**排热量:** {low_stage['heat_rejection_kw']} kW")
-                    st.write(f"**低温级总价:** ¥{low_stage['total_price']:,}")
-                    st.markdown('</div>', unsafe_allow_html=True)
-
-                with col2:
-                    st.markdown('<div class="cascade-system">', unsafe_allow_html=True)
-                    st.subheader("🔥 高温级系统 (比泽尔)")
-                    high_stage = proposal['high_stage']
-
-                    st.write(f"**压缩机:** {high_stage['brand']} {high_stage['model']}")
-                    st.write(f"**制冷剂:** {high_stage['refrigerant']}")
-                    st.write(f"**运行工况:** {high_stage['evap_temp']}°C → {high_stage['cond_temp']}°C")
-                    st.write(f"**单台能力:** {high_stage['single_capacity_kw']} kW")
-                    st.write(f"**单台功率:** {high_stage['single_power_kw']} kW")
-                    st.write(f"**单台COP:** {high_stage['single_cop']}")
-                    st.write(f"**配置数量:** {high_stage['selected_units']} 台")
-                    st.write(f"**总能力:** {high_stage['total_capacity_kw']} kW")
-                    st.write(f"**余量:** {high_stage['capacity_margin_percent']}%")
-                    st.write(f"**高温级总价:** ¥{high_stage['total_price']:,}")
-                    st.markdown('</div>', unsafe_allow_html=True)
-
-                with col3:
-                    st.markdown('<div class="cascade-system">', unsafe_allow_html=True)
-                    st.subheader("⚙️ 辅助设备选型")
-                    system_perf = proposal['system_performance']
-
-                    # 显示板换选型结果
-                    if 'plate_heat_exchanger' in system_perf and system_perf['plate_heat_exchanger']['selected']:
-                        plate = system_perf['plate_heat_exchanger']
-                        st.markdown("**板式换热器:**")
-                        st.write(f"型号: {plate['model']}")
-                        st.write(f"换热量: {plate['heat_exchange_capacity_kw']} kW")
-                        st.write(f"板换数量: {plate['plate_count']}")
-                        st.write(f"制冷泵: {plate['pump_count']} × {plate['pump_power_kw']}kW")
-                        st.write(f"价格: ¥{plate['total_price_yuan']:,}")
-                        st.markdown("---")
-                    else:
-                        st.write("⚠️ 板换未选型")
-                        st.markdown("---")
-
-                    # 显示蒸发冷选型结果
-                    if 'evaporative_condenser' in system_perf and system_perf['evaporative_condenser']['selected']:
-                        condenser = system_perf['evaporative_condenser']
-                        st.markdown("**蒸发式冷凝器:**")
-                        st.write(f"型号: {condenser['model']}")
-                        st.write(f"排热量: {condenser['heat_rejection_capacity_kw']} kW")
-                        st.write(f"数量: {condenser['required_count']}")
-                        st.write(f"单价: ¥{condenser['unit_price_yuan']:,}")
-                        st.write(f"总价: ¥{condenser['total_price_yuan']:,}")
-                        st.markdown("---")
-                    else:
-                        st.write("⚠️ 蒸发冷未选型")
-                        st.markdown("---")
-
-                    # 排热量分析
-                    if 'heat_rejection_analysis' in system_perf:
-                        heat = system_perf['heat_rejection_analysis']
-                        st.markdown("**排热量分析:**")
-                        st.write(f"低温级: {heat['low_stage_heat_rejection']} kW")
-                        st.write(f"高温级: {heat['high_stage_heat_rejection']} kW")
-                        st.write(f"总计: {heat['total_heat_rejection']} kW")
-
-                    st.markdown('</div>', unsafe_allow_html=True)
-
-                # 系统性能汇总
-                st.markdown("### 📊 系统性能汇总")
-
-                perf = proposal['system_performance']
-                col1, col2, col3, col4 = st.columns(4)
-
-                with col1:
-                    st.metric("总制冷量", f"{perf['total_cooling_capacity_kw']:.1f} kW")
-                with col2:
-                    st.metric("系统COP", f"{perf['system_cop']:.3f}")
-                with col3:
-                    st.metric("总功率", f"{perf['total_power_consumption_kw']:.1f} kW")
-                with col4:
-                    st.metric("年能耗", f"{perf['annual_energy_consumption_kwh']:,} 度")
-
-                # 成本分析
-                st.markdown("### 💰 成本分析")
-
-                auxiliary_cost = 0
-                if 'plate_heat_exchanger' in perf and perf['plate_heat_exchanger']['selected']:
-                    auxiliary_cost += perf['plate_heat_exchanger']['total_price_yuan']
-
-                if 'evaporative_condenser' in perf and perf['evaporative_condenser']['selected']:
-                    auxiliary_cost += perf['evaporative_condenser']['total_price_yuan']
-
-                compressor_cost = perf['total_compressor_cost']
-                budget_yuan = project_info['budget_limit'] * 10000
-                total_investment = compressor_cost + auxiliary_cost
-                budget_utilization = (compressor_cost / budget_yuan) * 100
-
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric("压缩机总投资", f"¥{compressor_cost:,}")
-                with col2:
-                    st.metric("辅助设备投资", f"¥{auxiliary_cost:,}")
-                with col3:
-                    st.metric("总投资", f"¥{total_investment:,}")
-                with col4:
-                    st.metric("预算利用率", f"{budget_utilization:.1f}%")
-
-                if budget_utilization <= 100:
-                    st.success(f"✅ 总投资在预算范围内，剩余 ¥{budget_yuan - total_investment:,.0f}")
-                else:
-                    st.warning(f"⚠️ 总投资超支 ¥{total_investment - budget_yuan:,.0f}")
-
-                # 详细辅助设备信息展开部分
-                with st.expander("📋 查看辅助设备详细信息"):
-                    col1, col2 = st.columns(2)
-
-                    with col1:
-                        if 'plate_heat_exchanger' in perf and perf['plate_heat_exchanger']['selected']:
-                            plate = perf['plate_heat_exchanger']
-                            st.markdown("#### 板式换热器详情")
-                            st.write(f"**型号:** {plate['model']}")
-                            st.write(f"**换热量:** {plate['heat_exchange_capacity_kw']} kW")
-                            st.write(f"**需求负荷:** {plate['required_capacity_kw']} kW")
-                            st.write(f"**板换数量:** {plate['plate_count']}")
-                            st.write(f"**制冷泵配置:** {plate['pump_count']}台 × {plate['pump_power_kw']}kW")
-                            st.write(f"**管道接口:**")
-                            if 'details' in plate and '氟利昂进口管径' in plate['details']:
-                                st.write(f"- 氟利昂进口: {plate['details']['氟利昂进口管径']}")
-                                st.write(f"- CO2进口: {plate['details']['CO2进口管径']}")
-                                st.write(f"- CO2出口: {plate['details']['CO2出口管径']}")
-                                st.write(f"- CO2回液口: {plate['details']['CO2回液口管径']}")
-                            st.write(
-                                f"**尺寸:** {plate['details'].get('长(mm)', '')}×{plate['details'].get('宽(mm)', '')}×{plate['details'].get('高(mm)', '')} mm")
-                            st.write(f"**价格:** ¥{plate['total_price_yuan']:,}")
-
-                    with col2:
-                        if 'evaporative_condenser' in perf and perf['evaporative_condenser']['selected']:
-                            condenser = perf['evaporative_condenser']
-                            st.markdown("#### 蒸发式冷凝器详情")
-                            st.write(f"**型号:** {condenser['model']}")
-                            st.write(f"**排热量:** {condenser['heat_rejection_capacity_kw']} kW")
-                            st.write(f"**需求排热量:** {condenser['required_heat_rejection_kw']} kW")
-                            st.write(f"**配置数量:** {condenser['required_count']}台")
-                            st.write(f"**风机功率:** {condenser['details'].get('轴流风机功率KW', '')}")
-                            st.write(f"**循环水泵功率:** {condenser['details'].get('循环水泵功率KW', '')}")
-                            st.write(f"**总功率:** {condenser['details'].get('总功率KW', '')} kW")
-                            st.write(f"**价格:** ¥{condenser['total_price_yuan']:,}")
-
-                # 导出按钮
-                st.markdown("### 💾 导出设计方案")
-
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    if st.button("📄 生成详细报告", use_container_width=True):
-                        report = generate_detailed_proposal_report(proposal, project_info, low_temp_rooms)
-                        st.download_button(
-                            label="下载报告",
-                            data=report,
-                            file_name=f"复叠系统设计方案_{proposal['proposal_name']}_{datetime.now().strftime('%Y%m%d_%H%M')}.txt",
-                            mime="text/plain"
-                        )
-                with col2:
-                    if st.button("🔄 重新选型", use_container_width=True):
-                        if 'selected_proposal_idx' in st.session_state:
-                            del st.session_state.selected_proposal_idx
-                        if 'selected_proposal' in st.session_state:
-                            del st.session_state.selected_proposal
-                        if 'proposals' in st.session_state:
-                            del st.session_state.proposals
-                        st.rerun()
-                with col3:
-                    if st.button("🏠 返回首页", use_container_width=True):
-                        st.switch_page("cold_storage_input_interface.py")
+                        # 标准化数据（0-1范围）：按列一次性计算，成本与能耗越低越好
+                        maxes = comparison_df[['系统COP', '总投资(万元)', '年能耗(万度)']].max()
+                        norm_cop = comparison_df['系统COP'] / maxes['系统COP']
+                        norm_cost = 1 - comparison_df['总投资(万元)'] / maxes['总投资(万元)']
+                        norm_energy = 1 - comparison_df['年能耗(万度)'] / maxes['年能耗(万度)']
+
+                        # 创建雷达图对比（按标准化数据缓存图表）
+                        fig = build_radar(tuple(zip(
+                            comparison_df['方案'].tolist(), norm_cop.tolist(),
+                            norm_cost.tolist(), norm_energy.tolist()
+                        )))
+
+                        st.plotly_chart(fig, use_container_width=True, config=_RADAR_CONFIG)
+
+                # 显示系统配置、性能与成本分析及导出（局部刷新）
+                render_proposal(
+                    proposal, project_info, low_temp_rooms,
+                    (total_equipment_load, total_mechanical_load)
+                )
 
         except Exception as e:
             st.error(f"复叠系统选型失败: {e}")
@@ -0,0 +1,12 @@
+"""
+numba兼容层
+安装numba时提供其njit装饰器，否则提供同签名的空装饰器，被装饰函数按原样（纯Python/NumPy）执行
+"""
+try:
+    from numba import njit
+except ImportError:
+    # 未安装numba时直接返回原函数
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -7,6 +7,11 @@ from datetime import datetime
 import json
 import os
 import pickle
+import pickletools
+import gzip
+
+# gzip文件头魔数，用于区分压缩与旧版未压缩的项目文件
+GZIP_MAGIC = b'\x1f\x8b'
 
 class ColdStorageInputInterface:
     """冷库参数输入界面"""
@@ -155,9 +160,24 @@ class ColdStorageInputInterface:
                 'version': '1.0'
             }
 
-            # 保存为pickle文件
+            # 保存为pickle文件（最高协议并精简操作码，再以1级gzip快速压缩；mtime=0使相同数据生成相同文件）
+            payload = gzip.compress(
+                pickletools.optimize(pickle.dumps(save_data, protocol=pickle.HIGHEST_PROTOCOL)),
+                compresslevel=1,
+                mtime=0
+            )
             with open(filename, 'wb') as f:
-                pickle.dump(save_data, f)
+                f.write(payload)
+
+            # 写入元数据文件，项目历史页面列出项目时无需读取完整数据
+            meta_data = {
+                'project_name': project_info.get('project_name', '未命名'),
+                'customer': project_info.get('customer_name', '未知'),
+                'save_time': save_data['save_time'],
+                'rooms_count': len(rooms_data)
+            }
+            with open(os.path.splitext(filename)[0] + '.meta.json', 'w', encoding='utf-8') as f:
+                json.dump(meta_data, f, ensure_ascii=False)
 
             return filename
         except Exception as e:
@@ -175,14 +195,18 @@ class ColdStorageInputInterface:
                     try:
                         filepath = os.path.join(save_dir, filename)
                         with open(filepath, 'rb') as f:
-                            project_data = pickle.load(f)
-                            saved_projects.append({
-                                'filename': filename,
-                                'filepath': filepath,
-                                'project_name': project_data.get('project_info', {}).get('project_name', '未知项目'),
-                                'save_time': project_data.get('save_time', ''),
-                                'data': project_data
-                            })
+                            payload = f.read()
+                        # 兼容旧版未压缩的pickle文件
+                        if payload[:2] == GZIP_MAGIC:
+                            payload = gzip.decompress(payload)
+                        project_data = pickle.loads(payload)
+                        saved_projects.append({
+                            'filename': filename,
+                            'filepath': filepath,
+                            'project_name': project_data.get('project_info', {}).get('project_name', '未知项目'),
+                            'save_time': project_data.get('save_time', ''),
+                            'data': project_data
+                        })
                     except Exception as e:
                         print(f"加载项目文件失败 {filename}: {e}")
 
@@ -0,0 +1,36 @@
+"""
+冷库热负荷计算内核
+纯标量浮点运算，安装numba时JIT编译，否则按纯Python执行
+"""
+from _numba_compat import njit
+
+
+@njit(cache=True, fastmath=True)
+def q1_envelope(length, width, height, ins_mm, room_t,
+                top_t, bot_t, e_t, w_t, s_t, n_t,
+                top_f=1.6, bot_f=0.6, wall_f=1.3):
+    """
+    Q1侵入热（围护结构传热）计算
+
+    返回 (q1, 顶部热量, 底部热量, 东墙热量, 西墙热量, 南墙热量, 北墙热量, 总热量和, 传热系数)
+    """
+    # 各面面积：顶/底、东/西、南/北两两相同，只计算一次
+    lw = length * width
+    wh = width * height
+    lh = length * height
+
+    # 各面热量 = 面积 × 温差 × 修正系数
+    top_heat = lw * (top_t - room_t) * top_f
+    bottom_heat = lw * (bot_t - room_t) * bot_f
+    east_heat = wh * (e_t - room_t) * wall_f
+    west_heat = wh * (w_t - room_t) * wall_f
+    south_heat = lh * (s_t - room_t) * wall_f
+    north_heat = lh * (n_t - room_t) * wall_f
+
+    total_heat = top_heat + bottom_heat + east_heat + west_heat + south_heat + north_heat
+
+    # 传热系数
+    k_factor = 0.000024 * 1000 / ins_mm
+
+    q1 = k_factor * total_heat
+    return q1, top_heat, bottom_heat, east_heat, west_heat, south_heat, north_heat, total_heat, k_factor
@@ -5,6 +5,17 @@ from datetime import datetime
 import os
 import json
 import pickle
+import mmap
+import gzip
+import zipfile
+from io import BytesIO
+import threading
+
+try:
+    import orjson
+except ImportError:
+    # 未安装orjson时使用标准库json
+    orjson = None
 
 st.set_page_config(
     page_title="项目历史记录",
@@ -13,67 +24,173 @@ st.set_page_config(
 
 st.title("📚 项目历史记录")
 
-# 加载所有保存的项目
-def load_all_projects():
+# 项目保存目录及文件类型
+SAVE_DIRS = ("saved_projects", "autosave_data")
+PROJECT_FILE_EXTS = ('.pkl', '.json')
+# 项目元数据文件后缀：列表页只需读取这些小文件
+PROJECT_META_SUFFIX = '.meta.json'
+# gzip文件头魔数，用于区分压缩与旧版未压缩的pickle文件
+GZIP_MAGIC = b'\x1f\x8b'
+# 保存时间解析格式：pandas 2.0起用ISO8601逐个解析；旧版本不认识该值，不传format时本就逐个解析
+SAVE_TIME_FORMAT = 'ISO8601' if int(pd.__version__.split('.')[0]) >= 2 else None
+
+def _projects_fingerprint():
+    """保存目录的轻量指纹：各项目文件的 (路径, 文件名, 修改时间, 大小, 元数据文件修改时间)，只读取stat信息"""
+    fingerprint = []
+    for save_dir in SAVE_DIRS:
+        try:
+            it = os.scandir(save_dir)
+        except FileNotFoundError:
+            continue
+        
+        # DirEntry自带文件名和类型信息，无需再拼接路径或额外判断
+        with it:
+            entries = [entry for entry in it if entry.is_file()]
+        
+        meta_mtimes = {entry.name: entry.stat().st_mtime_ns
+                       for entry in entries if entry.name.endswith(PROJECT_META_SUFFIX)}
+        for entry in entries:
+            if entry.name.endswith(PROJECT_FILE_EXTS) and not entry.name.endswith(PROJECT_META_SUFFIX):
+                stat = entry.stat()
+                meta_name = os.path.splitext(entry.name)[0] + PROJECT_META_SUFFIX
+                fingerprint.append((entry.path, entry.name, stat.st_mtime_ns, stat.st_size,
+                                    meta_mtimes.get(meta_name)))
+    return tuple(fingerprint)
+
+def _read_json_file(filepath):
+    """读取JSON文件，优先使用orjson解析，orjson不支持的内容（如NaN、Infinity）改用标准库解析"""
+    if orjson is not None:
+        with open(filepath, 'rb') as f:
+            content = f.read()
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return json.loads(content)
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _read_project_file(filepath):
+    """读取完整的项目文件（pickle或json），pickle通过内存映射读取，gzip压缩文件自动解压"""
+    if filepath.endswith('.pkl'):
+        with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:2] == GZIP_MAGIC:
+                return pickle.loads(gzip.decompress(mm))
+            return pickle.loads(mm)
+    return _read_json_file(filepath)
+
+def _is_gzip_file(filepath):
+    """判断文件是否为gzip压缩（只读取文件头）"""
+    with open(filepath, 'rb') as f:
+        return f.read(2) == GZIP_MAGIC
+
+def _build_project_meta(data):
+    """提取列表页显示所需的项目元数据"""
+    return {
+        'project_name': data.get('project_info', {}).get('project_name', '未命名'),
+        'customer': data.get('project_info', {}).get('customer_name', '未知'),
+        'save_time': data.get('last_saved') or data.get('save_time', ''),
+        'rooms_count': len(data.get('rooms_data', []))
+    }
+
+@st.cache_resource
+def _parsed_project_files():
+    """已解析项目元数据的进程级缓存及其锁：(锁, {路径 -> ((修改时间, 大小), 项目记录)})，各会话共享"""
+    return threading.Lock(), {}
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_all_projects(fingerprint):
+    """
+    按目录指纹加载项目列表，只读取新增或有变化项目的元数据
+
+    返回 (项目列表, 错误信息列表, 待补写的元数据文件列表)，本函数只读不写
+    """
+    lock, parsed = _parsed_project_files()
     projects = []
+    errors = []
+    missing_meta = []
     
-    # 检查保存目录
-    save_dirs = ["saved_projects", "autosave_data"]
-    
-    for save_dir in save_dirs:
-        if os.path.exists(save_dir):
-            for filename in os.listdir(save_dir):
-                filepath = os.path.join(save_dir, filename)
+    # 共享缓存会被多个会话同时读写，整个更新过程持锁
+    with lock:
+        for filepath, filename, mtime_ns, size, meta_mtime_ns in fingerprint:
+            cached = parsed.get(filepath)
+            if cached is None or cached[0] != (mtime_ns, size):
+                meta_path = os.path.splitext(filepath)[0] + PROJECT_META_SUFFIX
                 try:
-                    if filename.endswith('.pkl'):
-                        with open(filepath, 'rb') as f:
-                            data = pickle.load(f)
-                    elif filename.endswith('.json'):
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
+                    if meta_mtime_ns is not None and meta_mtime_ns >= mtime_ns:
+                        meta = _read_json_file(meta_path)
                     else:
-                        continue
-                    
-                    projects.append({
-                        'filename': filename,
-                        'filepath': filepath,
-                        'project_name': data.get('project_info', {}).get('project_name', '未命名'),
-                        'customer': data.get('project_info', {}).get('customer_name', '未知'),
-                        'save_time': data.get('last_saved') or data.get('save_time', ''),
-                        'rooms_count': len(data.get('rooms_data', [])),
-                        'data': data
-                    })
+                        # 旧项目没有（或有过期的）元数据文件：读取完整项目，由调用方补写
+                        meta = _build_project_meta(_read_project_file(filepath))
+                        missing_meta.append((meta_path, meta))
                 except Exception as e:
-                    st.warning(f"加载文件失败 {filename}: {e}")
+                    errors.append(f"加载文件失败 {filename}: {e}")
+                    continue
+                
+                cached = ((mtime_ns, size), {
+                    'filename': filename,
+                    'filepath': filepath,
+                    **meta
+                })
+                parsed[filepath] = cached
+            
+            projects.append(cached[1])
+        
+        # 清除已删除文件的缓存
+        existing = {entry[0] for entry in fingerprint}
+        for filepath in [path for path in parsed if path not in existing]:
+            del parsed[filepath]
     
     # 按时间排序
     projects.sort(key=lambda x: x.get('save_time', ''), reverse=True)
+    return projects, errors, missing_meta
+
+# 补写缺失的元数据文件，下次列表加载时只需读取这些小文件
+def _write_project_metas(missing_meta):
+    for meta_path, meta in missing_meta:
+        try:
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+        except OSError:
+            pass
+
+# 加载所有保存的项目（目录未变化时直接复用缓存）
+def load_all_projects():
+    projects, errors, missing_meta = _load_all_projects(_projects_fingerprint())
+    _write_project_metas(missing_meta)
+    for message in errors:
+        st.warning(message)
     return projects
 
+# 按需加载完整项目数据，按文件路径缓存在session_state中
+def load_project(filepath):
+    loaded_projects = st.session_state.setdefault('loaded_projects', {})
+    if filepath not in loaded_projects:
+        loaded_projects[filepath] = _read_project_file(filepath)
+    return loaded_projects[filepath]
+
 # 显示项目列表
 projects = load_all_projects()
 
 if projects:
     st.success(f"找到 {len(projects)} 个保存的项目")
     
-    # 创建数据表格
-    project_data = []
-    for i, proj in enumerate(projects):
-        save_time = proj['save_time']
-        if isinstance(save_time, str) and len(save_time) > 10:
-            save_time = save_time[:19].replace('T', ' ')
-        
-        project_data.append({
-            '序号': i + 1,
-            '项目名称': proj['project_name'],
-            '客户': proj['customer'],
-            '冷间数量': proj['rooms_count'],
-            '保存时间': save_time,
-            '文件': proj['filename']
-        })
-    
-    df = pd.DataFrame(project_data)
-    st.dataframe(df, use_container_width=True)
+    # 创建数据表格（按列构建）
+    df = pd.DataFrame({
+        '序号': range(1, len(projects) + 1),
+        '项目名称': [proj['project_name'] for proj in projects],
+        '客户': [proj['customer'] for proj in projects],
+        '冷间数量': [proj['rooms_count'] for proj in projects],
+        '保存时间': pd.to_datetime([proj['save_time'] for proj in projects], errors='coerce', format=SAVE_TIME_FORMAT),
+        '文件': [proj['filename'] for proj in projects]
+    })
+    # 保存时间由前端按格式显示，无需在Python中逐行格式化
+    st.dataframe(
+        df,
+        use_container_width=True,
+        column_config={
+            '保存时间': st.column_config.DatetimeColumn("保存时间", format="YYYY-MM-DD HH:mm:ss")
+        }
+    )
     
     # 选择项目操作
     selected_idx = st.selectbox(
@@ -89,27 +206,44 @@ if projects:
         
         with col1:
             if st.button("📂 加载此项目", use_container_width=True):
-                st.session_state.project_info = selected_project['data']['project_info']
-                st.session_state.rooms_data = selected_project['data']['rooms_data']
-                st.success(f"已加载项目: {selected_project['project_name']}")
-                st.switch_page("cold_storage_input_interface.py")
+                try:
+                    project_data = load_project(selected_project['filepath'])
+                except Exception as e:
+                    st.error(f"加载失败: {e}")
+                else:
+                    st.session_state.project_info = project_data['project_info']
+                    st.session_state.rooms_data = project_data['rooms_data']
+                    st.success(f"已加载项目: {selected_project['project_name']}")
+                    st.switch_page("cold_storage_input_interface.py")
         
         with col2:
             if st.button("🔍 查看详情", use_container_width=True):
-                st.subheader(f"项目详情: {selected_project['project_name']}")
-                
-                # 显示项目信息
-                st.json(selected_project['data']['project_info'])
+                try:
+                    project_data = load_project(selected_project['filepath'])
+                except Exception as e:
+                    st.error(f"加载失败: {e}")
+                    project_data = None
                 
-                # 显示冷间信息
-                st.subheader("冷间列表")
-                rooms_df = pd.DataFrame(selected_project['data']['rooms_data'])
-                st.dataframe(rooms_df[['room_name', 'temperature', 'length', 'width', 'height']])
+                if project_data is not None:
+                    st.subheader(f"项目详情: {selected_project['project_name']}")
+                    
+                    # 显示项目信息
+                    st.json(project_data['project_info'])
+                    
+                    # 显示冷间信息
+                    st.subheader("冷间列表")
+                    rooms_df = pd.DataFrame(project_data['rooms_data'])
+                    st.dataframe(rooms_df[['room_name', 'temperature', 'length', 'width', 'height']])
         
         with col3:
             if st.button("🗑️ 删除此项目", type="secondary", use_container_width=True):
                 try:
                     os.remove(selected_project['filepath'])
+                    meta_path = os.path.splitext(selected_project['filepath'])[0] + PROJECT_META_SUFFIX
+                    if os.path.exists(meta_path):
+                        os.remove(meta_path)
+                    st.session_state.get('loaded_projects', {}).pop(selected_project['filepath'], None)
+                    _load_all_projects.clear()
                     st.success(f"已删除项目: {selected_project['project_name']}")
                     st.rerun()
                 except Exception as e:
@@ -121,14 +255,13 @@ if projects:
     
     with col1:
         if st.button("📥 导出所有项目", use_container_width=True):
-            # 创建zip文件
-            import zipfile
-            from io import BytesIO
-            
+            # 创建zip文件：压缩级别1以速度优先，已gzip压缩的项目文件直接存储不再重复压缩
             zip_buffer = BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w') as zip_file:
+            with zipfile.ZipFile(zip_buffer, 'w', compression=zipfile.ZIP_DEFLATED,
+                                 compresslevel=1, strict_timestamps=False) as zip_file:
                 for proj in projects:
-                    zip_file.write(proj['filepath'], proj['filename'])
+                    compress_type = zipfile.ZIP_STORED if _is_gzip_file(proj['filepath']) else None
+                    zip_file.write(proj['filepath'], proj['filename'], compress_type=compress_type)
             
             st.download_button(
                 label="下载ZIP文件",